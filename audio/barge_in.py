@@ -0,0 +1,61 @@
+import queue
+
+from audio.recorder import open_input_stream, capture_turn
+from audio.vad import EnergyGate, frame_length
+from audio.wake_listener import RingBuffer
+from config.settings import (
+    SAMPLE_RATE,
+    BARGE_IN_MIN_DB,
+    BARGE_IN_MIN_SPEECH_SECONDS,
+    BARGE_IN_PRE_ROLL_SECONDS,
+)
+from tts.speaker import speak_async, stop_speaking
+
+
+def speak_interruptible(texts):
+    """
+    Speak ``texts`` while listening to the microphone.
+
+    Playback runs on the TTS worker; this thread watches the mic. If the
+    user talks over the assistant, playback stops at once and their
+    utterance is captured until they go quiet. Returns the int16
+    samples of that utterance, or None if everything was spoken
+    without interruption.
+    """
+    events = [speak_async(text) for text in texts]
+    if not events:
+        return None
+
+    frame_len = frame_length()
+    trigger_frames = max(1, int(BARGE_IN_MIN_SPEECH_SECONDS * SAMPLE_RATE / frame_len))
+    pre_roll_size = int(BARGE_IN_PRE_ROLL_SECONDS * SAMPLE_RATE) + trigger_frames * frame_len
+    pre_roll = RingBuffer(pre_roll_size)
+
+    # echo of our own voice must stay below this gate
+    barge_gate = EnergyGate(min_db=BARGE_IN_MIN_DB)
+    frames = queue.Queue()
+    voiced = 0
+
+    with open_input_stream(frames):
+        while not events[-1].is_set():
+            try:
+                frame = frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            pre_roll.write(frame)
+            voiced = voiced + 1 if barge_gate.is_speech(frame) else 0
+            if voiced < trigger_frames:
+                continue
+
+            # 🛑 User is talking: stop speaking and keep recording
+            print("Barge-in detected.")
+            stop_speaking()
+            return capture_turn(
+                frames,
+                EnergyGate(),
+                chunks=[pre_roll.last(pre_roll_size)],
+                heard_speech=True,
+            )
+
+    return None
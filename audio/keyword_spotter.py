@@ -0,0 +1,78 @@
+import numpy as np
+
+from config.settings import (
+    WAKE_SPOTTER,
+    WAKE_SPOTTER_MODELS,
+    WAKE_SPOTTER_THRESHOLD,
+    WAKE_SPOTTER_MIN_LOGPROB,
+)
+from stt.backends import to_float32
+from stt.whisper_engine import get_backend, model_for
+
+
+class OpenWakeWordSpotter:
+    """
+    openwakeword ONNX models (a few ms per candidate on CPU). Fires when
+    any model scores at least ``threshold`` on some 80 ms chunk; the
+    model's name ("hey_zara" -> "hey zara") is what was heard.
+    """
+
+    name = "openwakeword"
+    CHUNK = 1280  # 80 ms at 16 kHz
+
+    def __init__(self, model_paths, threshold=0.5):
+        from openwakeword.model import Model
+
+        if not model_paths:
+            raise RuntimeError("WAKE_SPOTTER_MODELS lists no openwakeword models")
+        self.model = Model(wakeword_models=list(model_paths), inference_framework="onnx")
+        self.threshold = threshold
+
+    def detect(self, samples):
+        self.model.reset()
+        samples = samples.reshape(-1).astype(np.int16, copy=False)
+        for start in range(0, len(samples) - self.CHUNK + 1, self.CHUNK):
+            scores = self.model.predict(samples[start:start + self.CHUNK])
+            name, score = max(scores.items(), key=lambda item: item[1], default=(None, 0.0))
+            if score >= self.threshold:
+                return name.replace("_", " ")
+        return None
+
+
+class PhraseSpotter:
+    """
+    Scores the candidate against the wake phrases only, with the STT
+    backend's constrained scorer (one encoder pass and one batched,
+    teacher-forced decoder pass; no decoding search). The best phrase
+    is the result, so a hit is never transcribed a second time.
+    """
+
+    name = "phrases"
+
+    def __init__(self, phrases, model_size, min_logprob):
+        self.phrases = list(phrases)
+        self.model_size = model_size
+        self.min_logprob = min_logprob
+
+    def detect(self, samples):
+        audio = to_float32(samples.reshape(-1))
+        index = get_backend().choose(audio, self.phrases, self.model_size, min_logprob=self.min_logprob)
+        return None if index is None else self.phrases[index]
+
+
+def create_spotter(phrases):
+    """
+    The keyword spotter from WAKE_SPOTTER, or None when no stage cheaper
+    than a full transcription is available.
+    """
+    if WAKE_SPOTTER == "openwakeword":
+        try:
+            return OpenWakeWordSpotter(WAKE_SPOTTER_MODELS, WAKE_SPOTTER_THRESHOLD)
+        except Exception as e:
+            print(f"openwakeword unavailable ({e}), falling back to phrase scoring")
+
+    if WAKE_SPOTTER in ("openwakeword", "phrases") and get_backend().scores_phrases:
+        return PhraseSpotter(phrases, model_for("wake"), WAKE_SPOTTER_MIN_LOGPROB)
+
+    print("No wake word spotter, every candidate is transcribed")
+    return None
@@ -1,6 +1,16 @@
+import queue
+
+import numpy as np
 import sounddevice as sd
 import scipy.io.wavfile as wav
-from config.settings import SAMPLE_RATE, RECORD_SECONDS
+from audio.vad import EnergyGate, frame_length
+from config.settings import (
+    SAMPLE_RATE,
+    RECORD_SECONDS,
+    ENDPOINT_SILENCE_SECONDS,
+    ENDPOINT_LEAD_IN_SECONDS,
+    MAX_UTTERANCE_SECONDS,
+)
 
 def record_audio(output_file):
     print("Recording... Speak now.")
@@ -24,3 +34,96 @@ def record_audio_seconds(output_file, seconds):
     )
     sd.wait()
     wav.write(output_file, SAMPLE_RATE, audio)
+
+
+def open_input_stream(frames):
+    """
+    Microphone stream that pushes one VAD-sized int16 frame at a time
+    onto the ``frames`` queue.
+    """
+    def callback(indata, frame_count, time_info, status):
+        frames.put(indata[:, 0].copy())
+
+    return sd.InputStream(
+        samplerate=SAMPLE_RATE,
+        channels=1,
+        dtype="int16",
+        blocksize=frame_length(),
+        callback=callback,
+    )
+
+
+def capture_turn(
+    frames,
+    gate,
+    chunks=None,
+    heard_speech=False,
+    max_seconds=MAX_UTTERANCE_SECONDS,
+    silence_seconds=ENDPOINT_SILENCE_SECONDS,
+    lead_in_seconds=ENDPOINT_LEAD_IN_SECONDS,
+):
+    """
+    Read frames from an open stream until the turn is over and return
+    all samples. ``chunks``/``heard_speech`` let a caller continue a
+    turn that already started (e.g. after barge-in).
+    """
+    frame_seconds = frame_length() / SAMPLE_RATE
+    max_frames = int(max_seconds / frame_seconds)
+    silence_frames = int(silence_seconds / frame_seconds)
+    lead_in_frames = int(lead_in_seconds / frame_seconds)
+
+    chunks = list(chunks or [])
+    silence = 0
+
+    while len(chunks) < max_frames:
+        frame = frames.get()
+        chunks.append(frame)
+
+        if gate.is_speech(frame):
+            heard_speech = True
+            silence = 0
+        else:
+            silence += 1
+
+        if heard_speech and silence >= silence_frames:
+            break
+        if not heard_speech and len(chunks) >= lead_in_frames:
+            break
+
+    if not chunks:
+        return np.zeros(0, dtype=np.int16)
+    return np.concatenate(chunks)
+
+
+def record_until_silence(
+    output_file=None,
+    max_seconds=MAX_UTTERANCE_SECONDS,
+    silence_seconds=ENDPOINT_SILENCE_SECONDS,
+    lead_in_seconds=ENDPOINT_LEAD_IN_SECONDS,
+):
+    """
+    Record one spoken turn and stop as soon as the speaker goes quiet.
+
+    Recording ends when speech has been followed by ``silence_seconds``
+    of silence, when nobody has spoken within ``lead_in_seconds``, or
+    at ``max_seconds`` at the latest.
+
+    Returns the int16 samples. They are only written to ``output_file``
+    when one is given.
+    """
+    frames = queue.Queue()
+
+    print("Recording... Speak now.")
+    with open_input_stream(frames):
+        audio = capture_turn(
+            frames,
+            EnergyGate(),
+            max_seconds=max_seconds,
+            silence_seconds=silence_seconds,
+            lead_in_seconds=lead_in_seconds,
+        )
+
+    print(f"Recording finished ({len(audio) / SAMPLE_RATE:.1f}s).")
+    if output_file:
+        wav.write(output_file, SAMPLE_RATE, audio)
+    return audio
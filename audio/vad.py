@@ -0,0 +1,59 @@
+import numpy as np
+
+from config.settings import SAMPLE_RATE, VAD_FRAME_MS, VAD_MIN_DB, VAD_MARGIN_DB
+
+
+def frame_length(frame_ms=VAD_FRAME_MS):
+    return int(SAMPLE_RATE * frame_ms / 1000)
+
+
+def frame_energy_db(frame) -> float:
+    """
+    RMS level of an int16 frame in dBFS (0 dB = full scale).
+    """
+    if frame.size == 0:
+        return -100.0
+    samples = frame.astype(np.float32) / 32768.0
+    rms = float(np.sqrt(np.mean(samples * samples)))
+    return 20.0 * np.log10(max(rms, 1e-5))
+
+
+class EnergyGate:
+    """
+    Cheap frame-level voice activity detector.
+
+    A frame counts as speech when it is louder than both an absolute
+    floor and the running noise floor plus a margin. The noise floor
+    only adapts on non-speech frames, so long utterances do not raise it.
+    """
+
+    def __init__(self, min_db=VAD_MIN_DB, margin_db=VAD_MARGIN_DB, adapt=0.05):
+        self.min_db = min_db
+        self.margin_db = margin_db
+        self.adapt = adapt
+        self.noise_db = min_db - margin_db
+
+    def threshold(self) -> float:
+        return max(self.min_db, self.noise_db + self.margin_db)
+
+    def is_speech(self, frame) -> bool:
+        level = frame_energy_db(frame)
+        speech = level > self.threshold()
+        if not speech:
+            self.noise_db += self.adapt * (level - self.noise_db)
+        return speech
+
+
+def has_speech(samples, min_frames=3) -> bool:
+    """
+    True when a recorded buffer holds at least ``min_frames`` voiced frames.
+    """
+    frame_len = frame_length()
+    gate = EnergyGate()
+    voiced = 0
+    for start in range(0, len(samples) - frame_len + 1, frame_len):
+        if gate.is_speech(samples[start:start + frame_len]):
+            voiced += 1
+            if voiced >= min_frames:
+                return True
+    return False
@@ -0,0 +1,150 @@
+import queue
+
+import numpy as np
+import sounddevice as sd
+
+from audio.vad import EnergyGate, frame_length
+from config.settings import (
+    SAMPLE_RATE,
+    WAKE_RING_SECONDS,
+    WAKE_PRE_ROLL_SECONDS,
+    WAKE_MIN_SPEECH_SECONDS,
+    WAKE_MAX_SPEECH_SECONDS,
+    WAKE_HANGOVER_SECONDS,
+)
+
+
+class RingBuffer:
+    """
+    Fixed-size int16 buffer that always holds the most recent audio.
+    """
+
+    def __init__(self, size: int):
+        self._data = np.zeros(size, dtype=np.int16)
+        self._pos = 0
+        self._filled = 0
+
+    def write(self, samples):
+        n = len(samples)
+        size = len(self._data)
+        if n >= size:
+            self._data[:] = samples[-size:]
+            self._pos = 0
+            self._filled = size
+            return
+
+        end = self._pos + n
+        if end <= size:
+            self._data[self._pos:end] = samples
+        else:
+            split = size - self._pos
+            self._data[self._pos:] = samples[:split]
+            self._data[:end - size] = samples[split:]
+
+        self._pos = end % size
+        self._filled = min(size, self._filled + n)
+
+    def last(self, n: int):
+        n = min(n, self._filled)
+        start = (self._pos - n) % len(self._data)
+        if start + n <= len(self._data):
+            return self._data[start:start + n].copy()
+        return np.concatenate((self._data[start:], self._data[:self._pos]))
+
+
+def listen_for_wake_word(transcribe_segment, is_match, is_muted=None, spotter=None):
+    """
+    Continuously listen on the microphone and return the transcript of
+    the first short utterance accepted by ``is_match``.
+
+    Audio is analysed frame by frame with an energy gate. Only voiced
+    bursts whose length fits a wake phrase are handed to
+    ``transcribe_segment`` (int16 samples -> text), so the expensive
+    ASR model stays idle while the room is quiet or people are talking
+    at length. With a ``spotter`` (audio.keyword_spotter) the
+    spotter's answer replaces the transcription: ``detect`` returns the
+    phrase it heard or None, so a wake costs one model pass, not two.
+
+    While ``is_muted()`` is true (the assistant itself is speaking) and
+    for one hangover after it, audio is dropped, so the assistant can
+    never wake or shut itself down with its own voice.
+    """
+    frame_len = frame_length()
+    frame_seconds = frame_len / SAMPLE_RATE
+
+    min_frames = int(WAKE_MIN_SPEECH_SECONDS / frame_seconds)
+    max_frames = int(WAKE_MAX_SPEECH_SECONDS / frame_seconds)
+    hangover_frames = int(WAKE_HANGOVER_SECONDS / frame_seconds)
+    pre_roll = int(WAKE_PRE_ROLL_SECONDS * SAMPLE_RATE)
+
+    ring = RingBuffer(int(WAKE_RING_SECONDS * SAMPLE_RATE))
+    gate = EnergyGate()
+    frames = queue.Queue()
+
+    def callback(indata, frame_count, time_info, status):
+        frames.put(indata[:, 0].copy())
+
+    in_speech = False
+    too_long = False
+    voiced = 0
+    silence = 0
+    total = 0
+    muted = 0
+
+    with sd.InputStream(
+        samplerate=SAMPLE_RATE,
+        channels=1,
+        dtype="int16",
+        blocksize=frame_len,
+        callback=callback,
+    ):
+        while True:
+            frame = frames.get()
+            ring.write(frame)
+
+            # 🔇 Our own speech (and its echo tail) is never a candidate
+            if is_muted and is_muted():
+                muted = hangover_frames
+            if muted:
+                muted -= 1
+                in_speech = False
+                continue
+
+            speech = gate.is_speech(frame)
+
+            if not in_speech:
+                if speech:
+                    in_speech = True
+                    too_long = False
+                    voiced, silence, total = 1, 0, 1
+                continue
+
+            total += 1
+            if speech:
+                voiced += 1
+                silence = 0
+            else:
+                silence += 1
+
+            if voiced > max_frames:
+                too_long = True
+
+            if silence < hangover_frames:
+                continue
+
+            # 🔚 Candidate ended
+            in_speech = False
+            if too_long or voiced < min_frames:
+                continue
+
+            segment = ring.last(total * frame_len + pre_roll)
+            if spotter is not None:
+                text = spotter.detect(segment)
+                if text is None:
+                    continue
+            else:
+                text = transcribe_segment(segment)
+            print("Wake candidate:", text)
+
+            if is_match(text):
+                return text
@@ -0,0 +1,142 @@
+"""
+Throughput and memory benchmark for the HTML-to-speech extractor.
+
+    python -m benchmarks.html_benchmark
+    python -m benchmarks.html_benchmark --sizes 100 1000 4000 --repeats 5
+
+A corpus of synthetic newsletters (nested layout tables, inline CSS,
+tracking scripts, entities, images and links, like marketing mail) is
+generated at each size in KB. Every body is run through the previous
+regex chain and the streaming HtmlTextExtractor; the table shows MB/s
+and peak extra memory (tracemalloc) for both.
+
+A second table uses bodies with unterminated <style> tags (truncated or
+broken mail), where the old non-greedy DOTALL strip backtracks
+super-linearly; the regex column is skipped above LEGACY_MAX_KB there.
+"""
+
+import argparse
+import random
+import re
+import time
+import tracemalloc
+from html import unescape
+
+from utils.email_analyzer import analyze_email
+
+_WORDS = (
+    "offer sale new members exclusive today free shipping order now limited "
+    "time only discover collection spring summer update news weekly digest"
+).split()
+
+_STYLE = "<style>" + "".join(
+    f".c{i}{{color:#{i:06x};font-family:Arial,sans-serif;padding:{i % 20}px}}" for i in range(200)
+) + "</style>"
+
+_SCRIPT = '<script>var t="<p>tracking</p>";for(var i=0;i<10;i++){t+=i;}</script>'
+
+
+def _sentence(rng):
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 16))).capitalize() + "."
+
+
+def _block(rng, i):
+    return (
+        f'<table class="c{i % 200}" width="100%"><tr><td>'
+        f'<h2>{_sentence(rng)}</h2>'
+        f'<p style="margin:0">{_sentence(rng)} {_sentence(rng)} &amp; &nbsp;&copy;</p>'
+        f'<img src="https://cdn.example.com/{i}.png" alt="">'
+        f'<a href="https://example.com/item/{i}">{_sentence(rng)}</a>'
+        f'</td><td><div><span>{_sentence(rng)}</span></div></td></tr></table>'
+        + (_SCRIPT if i % 25 == 0 else "")
+    )
+
+
+def newsletter(size_kb, seed=0):
+    """
+    Synthetic newsletter HTML of roughly ``size_kb`` kilobytes.
+    """
+    rng = random.Random(seed)
+    parts = [f"<html><head><title>Newsletter</title>{_STYLE}</head><body>"]
+    size = len(parts[0])
+    i = 0
+    while size < size_kb * 1024:
+        block = _block(rng, i)
+        parts.append(block)
+        size += len(block)
+        i += 1
+    parts.append('<img src="https://t.example.com/open.gif" width="1" height="1"></body></html>')
+    return "".join(parts)
+
+
+def broken_newsletter(size_kb):
+    """
+    Text with ``<style>`` openers that are never closed.
+    """
+    chunk = "<p>text <style x>" + "word " * 20
+    return chunk * max(1, size_kb * 1024 // len(chunk))
+
+
+# the regex chain needs about a minute for 45 KB of broken_newsletter
+LEGACY_MAX_KB = 20
+
+
+def legacy_analyze(html):
+    """
+    The regex chain used before the streaming extractor.
+    """
+    has_images = bool(re.search(r"<img\s", html, re.IGNORECASE))
+    html = re.sub(r"<(script|style).*?>.*?</\1>", "", html, flags=re.DOTALL)
+    text = re.sub(r"<[^>]+>", "", html)
+    text = unescape(text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return has_images, text
+
+
+def streaming_analyze(html):
+    return analyze_email({"html": html})
+
+
+def measure(fn, html, repeats):
+    fn(html)  # warm-up
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(html)
+    seconds = (time.perf_counter() - start) / repeats
+
+    tracemalloc.start()
+    fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return len(html) / seconds / 1e6, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[50, 250, 1000, 4000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'size (KB)':>10}{'impl':>12}{'MB/s':>10}{'peak MB':>10}")
+    for size_kb in args.sizes:
+        html = newsletter(size_kb)
+        for name, fn in (("regex", legacy_analyze), ("streaming", streaming_analyze)):
+            throughput, peak = measure(fn, html, args.repeats)
+            print(f"{len(html) // 1024:>10}{name:>12}{throughput:>10.2f}{peak:>10.1f}")
+
+    print("\nUnterminated <style> tags")
+    print(f"{'size (KB)':>10}{'impl':>12}{'MB/s':>10}{'peak MB':>10}")
+    for size_kb in (5, 10, 20, 1000):
+        html = broken_newsletter(size_kb)
+        for name, fn in (("regex", legacy_analyze), ("streaming", streaming_analyze)):
+            if name == "regex" and size_kb > LEGACY_MAX_KB:
+                print(f"{len(html) // 1024:>10}{name:>12}{'skipped':>10}")
+                continue
+            throughput, peak = measure(fn, html, 1)
+            print(f"{len(html) // 1024:>10}{name:>12}{throughput:>10.2f}{peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Real-time factor benchmark for the STT backends.
+
+    python -m benchmarks.stt_benchmark
+    python -m benchmarks.stt_benchmark --backends whisper faster-whisper --models tiny.en base.en
+
+RTF = decode time / audio duration; below 1.0 is faster than real time.
+
+Clips are read from benchmarks/samples/*.wav (16 kHz mono). If the
+folder has no WAVs, one clip per phrase in SAMPLE_PHRASES is rendered
+with festival's text2wave, the same voice the assistant speaks with.
+"""
+
+import argparse
+import glob
+import os
+import subprocess
+import time
+
+import numpy as np
+import scipy.io.wavfile as wav
+from scipy.signal import resample_poly
+
+from config.settings import SAMPLE_RATE
+from stt.backends import BACKENDS, create_backend, to_float32
+
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples")
+
+SAMPLE_PHRASES = {
+    "short_yes": "Yes.",
+    "short_number": "Number three.",
+    "wake": "Hey Zara.",
+    "command": "Read the unread emails from John.",
+    "dictation": (
+        "Hi, I will not be able to join the meeting tomorrow morning. "
+        "Could we move it to Thursday afternoon instead? "
+        "I will send the updated report before then."
+    ),
+}
+
+
+def render_samples(directory=SAMPLES_DIR):
+    os.makedirs(directory, exist_ok=True)
+    for name, text in SAMPLE_PHRASES.items():
+        path = os.path.join(directory, f"{name}.wav")
+        subprocess.run(
+            ["text2wave", "-F", str(SAMPLE_RATE), "-o", path],
+            input=text.encode("utf-8"),
+            check=True,
+        )
+
+
+def load_clip(path):
+    rate, data = wav.read(path)
+    if data.ndim > 1:
+        data = data.mean(axis=1).astype(data.dtype)
+    if data.dtype != np.int16:
+        data = (data / np.abs(data).max() * 32767).astype(np.int16)
+    if rate != SAMPLE_RATE:
+        data = resample_poly(data, SAMPLE_RATE, rate).astype(np.int16)
+    return to_float32(data)
+
+
+def benchmark(backend_name, model_size, clips, repeats):
+    backend = create_backend(backend_name)
+
+    start = time.perf_counter()
+    backend.load(model_size)
+    load_seconds = time.perf_counter() - start
+
+    # warm-up decode so one-off allocations are not counted
+    backend.transcribe(clips[0][1], model_size)
+
+    audio_seconds = 0.0
+    decode_seconds = 0.0
+    for _ in range(repeats):
+        for _, audio in clips:
+            audio_seconds += len(audio) / SAMPLE_RATE
+            start = time.perf_counter()
+            backend.transcribe(audio, model_size)
+            decode_seconds += time.perf_counter() - start
+
+    return load_seconds, decode_seconds / audio_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backends", nargs="+", default=sorted(BACKENDS))
+    parser.add_argument("--models", nargs="+", default=["tiny.en", "base.en", "small.en"])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--samples", default=SAMPLES_DIR)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.samples, "*.wav")))
+    if not paths:
+        print(f"No WAVs in {args.samples}, rendering samples with text2wave...")
+        render_samples(args.samples)
+        paths = sorted(glob.glob(os.path.join(args.samples, "*.wav")))
+
+    clips = [(os.path.basename(p), load_clip(p)) for p in paths]
+    total = sum(len(a) for _, a in clips) / SAMPLE_RATE
+    print(f"{len(clips)} clips, {total:.1f}s of audio, {args.repeats} repeats\n")
+
+    print(f"{'backend':<16}{'model':<12}{'load (s)':>10}{'RTF':>10}")
+    for backend_name in args.backends:
+        for model_size in args.models:
+            try:
+                load_seconds, rtf = benchmark(backend_name, model_size, clips, args.repeats)
+            except Exception as e:
+                print(f"{backend_name:<16}{model_size:<12}  skipped: {e}")
+                continue
+            print(f"{backend_name:<16}{model_size:<12}{load_seconds:>10.2f}{rtf:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
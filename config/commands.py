@@ -3,9 +3,24 @@
 SUPPORTED_COMMANDS = [
     "send email",
     "read latest email",
+    "read unread emails",
+    "list unread emails",
     "summarize latest email",
     "delete latest email",
+    "delete all read emails",
     "yes",
     "no",
     "cancel"
 ]
+
+# Exact command phrases -> intent (used by the fast-path matcher)
+COMMAND_INTENTS = {
+    "send email": "SEND_EMAIL",
+    "read latest email": "READ_LATEST_EMAIL",
+    "read unread emails": "READ_UNREAD_EMAILS",
+    "list unread emails": "READ_UNREAD_EMAILS",
+    "summarize latest email": "SUMMARIZE_LATEST_EMAIL",
+    "delete latest email": "DELETE_LATEST_EMAIL",
+    "delete all read emails": "DELETE_LATEST_EMAIL",
+    "cancel": "CANCEL",
+}
@@ -7,6 +7,124 @@ LANGUAGE = "en"
 # Audio
 SAMPLE_RATE = 16000
 RECORD_SECONDS = 5
+SAVE_RECORDINGS = False  # also archive every turn as audio/<name>.wav (debugging)
+
+# Voice activity detection (energy gate)
+VAD_FRAME_MS = 30          # analysis frame length
+VAD_MIN_DB = -50.0         # absolute floor, frames below this are never speech
+VAD_MARGIN_DB = 10.0       # speech must be this far above the tracked noise floor
+
+# Endpointing (stop recording once the speaker goes quiet)
+ENDPOINT_SILENCE_SECONDS = 0.6   # trailing silence that ends a turn
+ENDPOINT_LEAD_IN_SECONDS = 4.0   # give up if nobody starts talking
+MAX_UTTERANCE_SECONDS = 8.0      # hard cap for commands and answers
+DICTATION_SILENCE_SECONDS = 1.5  # dictation tolerates longer pauses
+DICTATION_MAX_SECONDS = 30.0     # hard cap for dictated email bodies
+
+# Barge-in: talking over the assistant stops playback. The mic also
+# hears the speaker, so the gate is stricter than normal endpointing.
+BARGE_IN_MIN_DB = -30.0
+BARGE_IN_MIN_SPEECH_SECONDS = 0.25  # continuous speech needed to interrupt
+BARGE_IN_PRE_ROLL_SECONDS = 0.3     # audio kept from before the trigger
+
+# Wake word listener
+WAKE_RING_SECONDS = 3.0        # audio history kept in the ring buffer
+WAKE_PRE_ROLL_SECONDS = 0.2    # audio kept before speech onset
+WAKE_MIN_SPEECH_SECONDS = 0.2  # shorter bursts are clicks / noise
+WAKE_MAX_SPEECH_SECONDS = 2.0  # longer utterances are not a wake phrase
+WAKE_HANGOVER_SECONDS = 0.3    # trailing silence that ends a candidate
+
+# Keyword spotter run on every wake candidate instead of a transcription;
+# the phrase it reports is the wake transcript
+# "openwakeword" = small ONNX wake word models (pip install openwakeword)
+# "phrases" = Whisper scores the wake phrases only (no decoding)
+# None = transcribe every candidate
+WAKE_SPOTTER = "phrases"
+WAKE_SPOTTER_MODELS = []         # openwakeword model files, e.g. a trained "hey zara"
+WAKE_SPOTTER_THRESHOLD = 0.5     # openwakeword score
+WAKE_SPOTTER_MIN_LOGPROB = -1.5  # phrase scorer; its pick is final, nothing re-transcribes it
+
+# Speech to text
+# "whisper" = openai-whisper on PyTorch
+# "faster-whisper" = CTranslate2, quantized (needs the faster-whisper package)
+STT_BACKEND = "whisper"
+STT_COMPUTE_TYPE = "int8"  # faster-whisper only
+STT_CPU_THREADS = 0        # faster-whisper only, 0 = library default
+
+# Model size per kind of turn
+STT_MODEL_POLICY = {
+    "wake": "tiny.en",       # wake word candidates
+    "short": "tiny.en",      # yes / no, number picks
+    "command": "base.en",    # free-form commands, names, subjects
+    "dictation": "base.en",  # dictated email bodies (small.en is affordable with faster-whisper)
+}
+
+# LLM (Ollama)
+LLM_MODEL = "phi3:mini"
+LLM_KEEP_ALIVE = "30m"  # keep the model resident between commands
+
+# Rule-based intent matches at or above this skip the LLM
+INTENT_FASTPATH_MIN_CONFIDENCE = 0.8
+
+# LLM intent results cached by normalized utterance
+INTENT_CACHE_SIZE = 256
+INTENT_CACHE_TTL_SECONDS = 24 * 3600
+INTENT_CACHE_DIR = "cache/intents"  # None = memory only
+
+# Email summaries: extractive (TextRank) for short mail, LLM for long
+SUMMARY_SENTENCES = 3
+SUMMARY_ABSTRACTIVE_MIN_TOKENS = 400  # below this, no LLM call
+SUMMARY_MAX_INPUT_TOKENS = 1500       # long mail is trimmed to this for the LLM
+SUMMARY_MAX_OUTPUT_TOKENS = 120
+SUMMARY_CACHE_DIR = "cache/summaries"  # None = memory only
+
+# Short answers are scored against a fixed phrase list instead of
+# transcribed; the best candidate must reach this mean token log-prob
+SHORT_ANSWER_MIN_LOGPROB = -1.5
+
+# Text to speech
+TTS_ENGINE = "festival"  # "festival" (persistent process) or "piper" (in-process)
+PIPER_VOICE_PATH = "models/en_US-lessac-medium.onnx"
+TTS_BATCH_MAX_CHARS = 400  # queued sentences merged into one utterance up to this size
+TTS_CACHE_DIR = "cache/tts"  # pre-rendered fixed prompts
+TTS_TIMEOUT_SECONDS = 10.0            # festival command deadline: fixed part...
+TTS_TIMEOUT_SECONDS_PER_CHAR = 0.2    # ...plus this per character of text
+
+# Gmail REST (async client)
+GMAIL_API_URL = "https://gmail.googleapis.com/gmail/v1"
+GMAIL_MAX_CONCURRENCY = 8  # requests in flight / pooled connections
+GMAIL_HTTP_TIMEOUT_SECONDS = 30
+
+# OAuth token: refreshed in the background this long before it expires
+TOKEN_REFRESH_MARGIN_SECONDS = 300
+
+# Gmail transport: quota limiter, retries and circuit breaker
+GMAIL_QUOTA_UNITS_PER_SECOND = 250  # per-user Gmail limit
+GMAIL_MAX_RETRIES = 5
+GMAIL_BACKOFF_BASE_SECONDS = 0.5    # first retry waits up to this, doubling
+GMAIL_BACKOFF_MAX_SECONDS = 32.0
+GMAIL_BREAKER_FAILURES = 5          # consecutive failures before failing fast
+GMAIL_BREAKER_RESET_SECONDS = 30.0
+
+# Bodies fetched speculatively while a list is read out
+PREFETCH_CANDIDATES = 3
+
+# Local mailbox mirror (SQLite, synced via the Gmail history API)
+MAILBOX_DB_PATH = "cache/mailbox.sqlite3"
+MAILBOX_INITIAL_SYNC = 500            # messages copied on the first sync
+MAILBOX_SYNC_INTERVAL_SECONDS = 30.0  # reuse a sync this recent
+
+# New-mail announcements (history.list polling with adaptive backoff)
+WATCH_NEW_MAIL = True
+WATCH_MIN_INTERVAL_SECONDS = 20.0   # poll this often right after new mail
+WATCH_MAX_INTERVAL_SECONDS = 300.0  # back off to this when the inbox is quiet
+
+# Attachment downloads (content-addressed, deduplicated by sha256)
+ATTACHMENTS_DIR = "cache/attachments"
+ATTACHMENT_MAX_BYTES = 25 * 1024 * 1024  # Gmail's own attachment limit
+
+# Full-text search index (SQLite FTS5) fed by mailbox syncs
+SEARCH_DB_PATH = "cache/search.sqlite3"
 
 # Safety
 REQUIRE_CONFIRMATION = True
@@ -0,0 +1,79 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import ollama
+
+from config.settings import LLM_MODEL, LLM_KEEP_ALIVE, SAMPLE_RATE, STT_MODEL_POLICY
+from gmail.gmail_client import authenticate_gmail
+from stt.constrained import YES_NO_GRAMMAR
+from stt.whisper_engine import get_backend
+from tts.speaker import prerender_phrases
+
+
+def warm_stt():
+    """
+    Load every model size in the STT policy and run a dummy decode on
+    one second of silence so weights and kernels are ready.
+    """
+    backend = get_backend()
+    silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+    for model_size in sorted(set(STT_MODEL_POLICY.values())):
+        backend.load(model_size)
+        backend.transcribe(silence, model_size)
+
+    backend.choose(silence, list(YES_NO_GRAMMAR), STT_MODEL_POLICY["short"])
+
+
+def warm_llm():
+    """
+    Load the LLM into Ollama and generate one token.
+    """
+    ollama.generate(
+        model=LLM_MODEL,
+        prompt="Reply with OK.",
+        keep_alive=LLM_KEEP_ALIVE,
+        options={"num_predict": 1},
+    )
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def warm_up():
+    """
+    Warm up speech recognition, the LLM, the Gmail client and the
+    cached voice prompts in parallel and print how long each took.
+
+    Returns the Gmail service. Other failures are reported but not
+    fatal; a Gmail failure is raised.
+    """
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = {
+            "Gmail": pool.submit(_timed, authenticate_gmail),
+            "Speech recognition": pool.submit(_timed, warm_stt),
+            "LLM": pool.submit(_timed, warm_llm),
+            "Voice prompts": pool.submit(_timed, prerender_phrases),
+        }
+
+        service = None
+        for name, future in futures.items():
+            try:
+                result, seconds = future.result()
+            except Exception as e:
+                print(f"⚠️  {name} warm-up failed: {e}")
+                if name == "Gmail":
+                    raise
+                continue
+
+            print(f"✅ {name} ready in {seconds:.1f}s")
+            if name == "Gmail":
+                service = result
+
+    print(f"Startup finished in {time.perf_counter() - start:.1f}s")
+    return service
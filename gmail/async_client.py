@@ -0,0 +1,238 @@
+import asyncio
+import threading
+
+import httpx
+
+from config.settings import GMAIL_API_URL, GMAIL_MAX_CONCURRENCY, GMAIL_HTTP_TIMEOUT_SECONDS
+from gmail.gmail_client import (
+    LIST_HEADERS,
+    get_credentials,
+    _summarize,
+    _header,
+    _new_message,
+    _reply_message,
+    _forward_message,
+)
+from gmail.credentials import refresh_credentials
+from gmail.transport import get_transport
+
+
+class AsyncGmailClient:
+    """
+    asyncio Gmail client over one pooled keep-alive httpx connection.
+
+    Mirrors the gmail_client function surface (send_email,
+    get_unread_emails, delete_email, ...) but every call is a coroutine,
+    and at most ``max_concurrency`` requests are in flight at once.
+    ``base_url``/``transport`` let tests point it at a fake server.
+    """
+
+    def __init__(
+        self,
+        credentials=None,
+        base_url=GMAIL_API_URL,
+        max_concurrency=GMAIL_MAX_CONCURRENCY,
+        timeout=GMAIL_HTTP_TIMEOUT_SECONDS,
+        transport=None,
+    ):
+        self._credentials = credentials
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/") + "/users/me",
+            timeout=timeout,
+            transport=transport,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+        )
+
+    async def _auth_headers(self):
+        creds = self._credentials
+        if creds is None:
+            return {}
+        if not creds.valid:
+            await asyncio.to_thread(refresh_credentials, creds)
+        return {"Authorization": f"Bearer {creds.token}"}
+
+    async def _request(self, method, path, name, **kwargs):
+        """
+        One API call through the shared transport (rate limit, retries,
+        circuit breaker); ``name`` is the API method for quota accounting.
+        """
+        async def send():
+            headers = await self._auth_headers()
+            return await self._client.request(method, path, headers=headers, **kwargs)
+
+        async with self._semaphore:
+            response = await get_transport().execute_async(
+                send, name, errors=(httpx.TransportError,)
+            )
+            response.raise_for_status()
+            return response.json() if response.content else {}
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    # ---------- raw endpoints ----------
+
+    async def list_messages(self, **params):
+        return await self._request("GET", "/messages", "messages.list", params=params)
+
+    async def get_message(self, msg_id, format="full"):
+        params = {"format": format}
+        if format == "metadata":
+            params["metadataHeaders"] = LIST_HEADERS
+        return await self._request("GET", f"/messages/{msg_id}", "messages.get", params=params)
+
+    async def get_messages(self, msg_ids, format="full"):
+        """
+        Fetch many messages concurrently (bounded by the semaphore).
+        """
+        results = await asyncio.gather(
+            *(self.get_message(i, format) for i in msg_ids),
+            return_exceptions=True,
+        )
+        messages = []
+        for msg_id, result in zip(msg_ids, results):
+            if isinstance(result, Exception):
+                print(f"Gmail fetch failed for {msg_id}: {result}")
+            else:
+                messages.append(result)
+        return messages
+
+    async def stream_attachment(self, msg_id, attachment_id, chunk_size=64 * 1024):
+        """
+        Yield the raw JSON body of users.messages.attachments.get in
+        chunks as it arrives, without buffering the whole response.
+        """
+        path = f"/messages/{msg_id}/attachments/{attachment_id}"
+
+        async def send():
+            headers = await self._auth_headers()
+            request = self._client.build_request("GET", path, headers=headers)
+            return await self._client.send(request, stream=True)
+
+        async with self._semaphore:
+            response = await get_transport().execute_async(
+                send, "messages.attachments.get", errors=(httpx.TransportError,)
+            )
+            try:
+                if response.is_error:
+                    await response.aread()
+                    response.raise_for_status()
+                async for chunk in response.aiter_bytes(chunk_size):
+                    yield chunk
+            finally:
+                await response.aclose()
+
+    async def _send(self, body):
+        return await self._request("POST", "/messages/send", "messages.send", json=body)
+
+    # ---------- gmail_client surface ----------
+
+    async def send_email(self, to_email, subject, body):
+        sent = await self._send(_new_message(to_email, subject, body))
+        return sent["id"]
+
+    async def get_latest_email(self):
+        results = await self.list_messages(maxResults=1, labelIds="INBOX")
+        messages = results.get("messages", [])
+        if not messages:
+            return None
+        message = await self.get_message(messages[0]["id"], format="metadata")
+        return _summarize(message)
+
+    async def _list_and_fetch(self, **params):
+        results = await self.list_messages(**params)
+        ids = [m["id"] for m in results.get("messages", [])]
+        return [_summarize(m) for m in await self.get_messages(ids, format="metadata")]
+
+    async def get_unread_emails(self, max_results=10):
+        return await self._list_and_fetch(labelIds=["INBOX", "UNREAD"], maxResults=max_results)
+
+    async def get_emails_from_sender(self, sender_email, max_results=3):
+        return await self._list_and_fetch(q=f"from:{sender_email}", maxResults=max_results)
+
+    async def load_email_body(self, email):
+        full = await self.get_message(email["id"], format="full")
+        return email.load(full)
+
+    async def delete_email(self, msg_id):
+        await self._request("POST", f"/messages/{msg_id}/trash", "messages.trash")
+        return True
+
+    async def reply_to_email(self, original_email, reply_text):
+        msg = original_email.get("raw", {})
+        if not _header(msg, "Message-ID"):
+            msg = await self.get_message(original_email["id"], format="metadata")
+        await self._send(_reply_message(msg, reply_text))
+
+    async def forward_email(self, email_obj, to_email):
+        await self._send(_forward_message(email_obj, to_email))
+
+
+class BackgroundLoop:
+    """
+    Event loop on a daemon thread, so blocking code (the voice loop)
+    can start Gmail coroutines and collect the results later.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="gmail-async", daemon=True)
+        self._thread.start()
+
+    def submit(self, coro):
+        """
+        Schedule a coroutine; returns a concurrent.futures.Future.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call(self, fn):
+        """
+        Run ``fn()`` on the loop thread and return its result.
+        """
+        async def run():
+            return fn()
+        return self.submit(run()).result()
+
+
+_loop = None
+_client = None
+_lock = threading.Lock()
+
+
+def get_background_loop() -> BackgroundLoop:
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = BackgroundLoop()
+    return _loop
+
+
+def get_async_gmail() -> AsyncGmailClient:
+    """
+    Shared client bound to the background loop, using the credentials
+    from authenticate_gmail().
+    """
+    global _client
+    loop = get_background_loop()
+    with _lock:
+        if _client is None:
+            # asyncio primitives must be created on the loop that uses them
+            _client = loop.call(lambda: AsyncGmailClient(get_credentials()))
+    return _client
+
+
+def run_async(coro):
+    """
+    Run a Gmail coroutine in the background; returns a Future.
+    """
+    return get_background_loop().submit(coro)
@@ -0,0 +1,214 @@
+import base64
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+
+from config.settings import ATTACHMENTS_DIR, ATTACHMENT_MAX_BYTES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    message_id TEXT,
+    part_id TEXT,
+    sha256 TEXT,
+    filename TEXT,
+    mime_type TEXT,
+    size INTEGER,
+    PRIMARY KEY (message_id, part_id)
+);
+"""
+
+
+class AttachmentTooLarge(Exception):
+    pass
+
+
+class DataFieldReader:
+    """
+    Pulls the value of the ``"data"`` string out of a streamed
+    attachments.get JSON body. base64url never needs JSON escaping, so
+    the value simply ends at the next quote.
+    """
+
+    _KEY = b'"data"'
+
+    def __init__(self):
+        self._buffer = b""
+        self._state = "key"  # key -> colon -> value -> done
+
+    def feed(self, chunk: bytes) -> bytes:
+        out = b""
+        data = self._buffer + chunk
+        self._buffer = b""
+
+        while data:
+            if self._state == "key":
+                i = data.find(self._KEY)
+                if i < 0:
+                    self._buffer = data[-(len(self._KEY) - 1):]  # key may straddle chunks
+                    return out
+                data = data[i + len(self._KEY):]
+                self._state = "colon"
+            elif self._state == "colon":
+                data = data.lstrip(b" \t\r\n:")
+                if data:
+                    data = data[1:]  # opening quote
+                    self._state = "value"
+            elif self._state == "value":
+                i = data.find(b'"')
+                if i < 0:
+                    return out + data
+                self._state = "done"
+                return out + data[:i]
+            else:
+                return out
+        return out
+
+    @property
+    def done(self) -> bool:
+        return self._state == "done"
+
+
+class Base64UrlDecoder:
+    """
+    Incremental base64url decoder: decodes whole 4-character groups and
+    carries the remainder over to the next chunk.
+    """
+
+    def __init__(self):
+        self._pending = b""
+
+    def feed(self, chunk: bytes) -> bytes:
+        data = self._pending + chunk
+        usable = len(data) - len(data) % 4
+        self._pending = data[usable:]
+        return base64.urlsafe_b64decode(data[:usable]) if usable else b""
+
+    def finish(self) -> bytes:
+        data, self._pending = self._pending, b""
+        if not data:
+            return b""
+        return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+class AttachmentStore:
+    """
+    On-demand attachment downloads into a content-addressed directory.
+
+    Bodies are streamed from users.messages.attachments.get, decoded
+    and hashed chunk by chunk and written to blobs/<sha256>; identical
+    files (the same PDF sent twice) are stored once. A small SQLite
+    table maps (message, part) to the blob, so a second request for
+    the same attachment costs no network at all.
+    """
+
+    def __init__(self, directory=ATTACHMENTS_DIR, max_bytes=ATTACHMENT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._blobs = os.path.join(directory, "blobs")
+        os.makedirs(self._blobs, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def blob_path(self, sha256):
+        return os.path.join(self._blobs, sha256[:2], sha256)
+
+    def lookup(self, msg_id, part_id):
+        """
+        Path of an already downloaded attachment, or None.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT sha256 FROM files WHERE message_id = ? AND part_id = ?",
+                (msg_id, part_id),
+            ).fetchone()
+        if row is None:
+            return None
+        path = self.blob_path(row[0])
+        return path if os.path.exists(path) else None
+
+    async def download(self, client, msg_id, attachment, on_progress=None):
+        """
+        Stream one attachment (a descriptor from the email record) to
+        disk and return its path. ``client`` is an AsyncGmailClient;
+        ``on_progress(done_bytes, total_bytes)`` is called per chunk.
+        """
+        path = self.lookup(msg_id, attachment["part_id"])
+        if path:
+            return path
+
+        total = attachment.get("size") or 0
+        if total > self.max_bytes:
+            raise AttachmentTooLarge(f"{attachment['filename']} is {total} bytes")
+
+        digest = hashlib.sha256()
+        written = 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".download-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for data in self._decoded_chunks(client, msg_id, attachment):
+                    written += len(data)
+                    if written > self.max_bytes:
+                        raise AttachmentTooLarge(f"{attachment['filename']} exceeds {self.max_bytes} bytes")
+                    digest.update(data)
+                    f.write(data)
+                    if on_progress:
+                        on_progress(written, total)
+
+            sha256 = digest.hexdigest()
+            path = self.blob_path(sha256)
+            if os.path.exists(path):
+                os.remove(tmp_path)  # same content already stored
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO files "
+                "(message_id, part_id, sha256, filename, mime_type, size) VALUES (?, ?, ?, ?, ?, ?)",
+                (msg_id, attachment["part_id"], sha256, attachment["filename"], attachment["mime_type"], written),
+            )
+        return path
+
+    @staticmethod
+    async def _decoded_chunks(client, msg_id, attachment):
+        """
+        Decoded bytes of an attachment: its inline data when the message
+        carried it, otherwise streamed from attachments.get.
+        """
+        if attachment.get("data"):
+            data = attachment["data"].encode()
+            yield base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+            return
+        if not attachment.get("attachment_id"):
+            raise ValueError(f"{attachment['filename']} has no data to download")
+
+        reader = DataFieldReader()
+        decoder = Base64UrlDecoder()
+        async for chunk in client.stream_attachment(msg_id, attachment["attachment_id"]):
+            data = decoder.feed(reader.feed(chunk))
+            if reader.done:
+                yield data + decoder.finish()
+                return
+            yield data
+
+
+_store = None
+_lock = threading.Lock()
+
+
+def get_attachment_store() -> AttachmentStore:
+    global _store
+    with _lock:
+        if _store is None:
+            _store = AttachmentStore()
+    return _store
@@ -0,0 +1,203 @@
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+import httplib2
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+
+from config.settings import TOKEN_REFRESH_MARGIN_SECONDS, GMAIL_HTTP_TIMEOUT_SECONDS
+
+SCOPES = ["https://www.googleapis.com/auth/gmail.modify"]
+
+TOKEN_PATH = "config/token.json"
+CREDENTIALS_PATH = "config/credentials.json"
+
+
+class CredentialManager:
+    """
+    Owns the OAuth credentials for the whole process.
+
+    Expired tokens are renewed with the refresh token; the browser flow
+    only runs when there is no usable token at all. A background thread
+    refreshes ``refresh_margin`` seconds before expiry so no request
+    waits on it, and every refresh is written back to token.json
+    atomically (a crash never leaves a half-written file).
+    """
+
+    def __init__(
+        self,
+        token_path=TOKEN_PATH,
+        client_secrets_path=CREDENTIALS_PATH,
+        scopes=SCOPES,
+        refresh_margin=TOKEN_REFRESH_MARGIN_SECONDS,
+    ):
+        self.token_path = token_path
+        self.client_secrets_path = client_secrets_path
+        self.scopes = scopes
+        self.refresh_margin = refresh_margin
+        self.credentials = None
+        self._http = None
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---------- token lifecycle ----------
+
+    def load(self):
+        """
+        Credentials from token.json, refreshed if needed; runs the
+        browser consent flow only as a last resort.
+        """
+        with self._lock:
+            if self.credentials is None and os.path.exists(self.token_path):
+                self.credentials = Credentials.from_authorized_user_file(self.token_path, self.scopes)
+
+            creds = self.credentials
+            if creds and creds.refresh_token and not creds.valid:
+                try:
+                    self.refresh()
+                except RefreshError as e:
+                    print("Stored Gmail token was rejected, signing in again:", e)
+                    self.credentials = None
+
+            if not self.credentials or not self.credentials.valid:
+                flow = InstalledAppFlow.from_client_secrets_file(self.client_secrets_path, self.scopes)
+                self.credentials = flow.run_local_server(port=0)
+                self.save()
+
+            return self.credentials
+
+    def seconds_left(self) -> float:
+        expiry = self.credentials.expiry if self.credentials else None
+        if expiry is None:
+            return float("inf")
+        now = datetime.now(timezone.utc).replace(tzinfo=None)  # expiry is naive UTC
+        return (expiry - now).total_seconds()
+
+    def refresh(self):
+        with self._lock:
+            self.credentials.refresh(Request())
+            self.save()
+
+    def ensure_valid(self):
+        """
+        Refresh now if the token is expired or about to expire.
+        """
+        with self._lock:
+            if not self.credentials.valid or self.seconds_left() < self.refresh_margin:
+                self.refresh()
+            return self.credentials
+
+    def save(self):
+        """
+        Write token.json via a temp file + rename, readable only by us.
+        """
+        directory = os.path.dirname(self.token_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".token-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.credentials.to_json())
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.token_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    # ---------- background refresh ----------
+
+    def start_auto_refresh(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, name="gmail-token", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _refresh_loop(self):
+        while True:
+            wait = max(0.0, self.seconds_left() - self.refresh_margin)
+            if self._stop.wait(min(wait, 3600.0)):
+                return
+            if self.seconds_left() > self.refresh_margin:
+                continue
+            try:
+                self.refresh()
+                print("Gmail token refreshed")
+            except Exception as e:
+                print("Gmail token refresh failed, retrying in a minute:", e)
+                if self._stop.wait(60.0):
+                    return
+
+    # ---------- HTTP / service ----------
+
+    def new_http(self):
+        return AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=GMAIL_HTTP_TIMEOUT_SECONDS))
+
+    def authorized_http(self):
+        """
+        The shared authorized connection used by the main service.
+        """
+        with self._lock:
+            if self._http is None:
+                self._http = self.new_http()
+            return self._http
+
+    def build_service(self, http=None):
+        """
+        Gmail service from the cached discovery document. ``http``
+        defaults to the shared connection; threads other than the main
+        one should pass ``new_http()`` (httplib2 is not thread-safe).
+        """
+        return build_from_document(_discovery_document(), http=http or self.authorized_http())
+
+
+_discovery = None
+
+
+def _discovery_document():
+    """
+    Gmail discovery document, parsed once per process from the copy
+    bundled with googleapiclient (no network round-trip).
+    """
+    global _discovery
+    if _discovery is None:
+        _discovery = json.loads(get_static_doc("gmail", "v1"))
+    return _discovery
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_credential_manager() -> CredentialManager:
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = CredentialManager()
+    return _manager
+
+
+def refresh_credentials(creds):
+    """
+    Refresh ``creds`` through the manager when it owns them, so the
+    new token is persisted and shared.
+    """
+    manager = get_credential_manager()
+    if creds is manager.credentials:
+        manager.ensure_valid()
+    else:
+        creds.refresh(Request())
@@ -1,58 +1,86 @@
-import os
 import base64
+import json
+import re
+from email.message import EmailMessage
 from email.mime.text import MIMEText
 
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 
-SCOPES = ["https://www.googleapis.com/auth/gmail.modify"]
+from gmail.credentials import get_credential_manager
+from gmail.mime import EmailRecord
+from gmail.transport import execute, get_transport
 
-TOKEN_PATH = "config/token.json"
-CREDENTIALS_PATH = "config/credentials.json"
+# Headers fetched for list views (reply_to_email needs Message-ID)
+LIST_HEADERS = ["From", "Subject", "Date", "Message-ID"]
 
+# Gmail accepts at most 100 calls per batch request
+BATCH_SIZE = 100
 
-def authenticate_gmail():
-    creds = None
+# ...and at most 1000 ids per messages.batchModify
+BATCH_MODIFY_SIZE = 1000
 
-    if os.path.exists(TOKEN_PATH):
-        creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
+# Search query behind "delete all read emails" (inbox only: never
+# Sent, Drafts or archived mail)
+READ_EMAILS_QUERY = "in:inbox -is:unread"
 
-    if not creds or not creds.valid:
-        flow = InstalledAppFlow.from_client_secrets_file(
-            CREDENTIALS_PATH, SCOPES
-        )
-        creds = flow.run_local_server(port=0)
+# batchModify statuses that can be caused by one of the ids...
+ID_ERROR_STATUSES = {400, 404}
 
-        with open(TOKEN_PATH, "w") as token:
-            token.write(creds.to_json())
+# ...when the error message names the id ("Invalid id value")
+_ID_MESSAGE = re.compile(r"\bids?\b", re.IGNORECASE)
 
-    service = build("gmail", "v1", credentials=creds)
-    return service
 
+def get_credentials():
+    """
+    Credentials from the last authenticate_gmail() call.
+    """
+    return get_credential_manager().credentials
 
-def send_email(service, to_email, subject, body):
+
+def authenticate_gmail():
+    """
+    Load (or refresh, or as a last resort sign in for) the Gmail token,
+    keep it fresh in the background and return the main service.
+    """
+    manager = get_credential_manager()
+    manager.load()
+    manager.start_auto_refresh()
+    return manager.build_service()
+
+
+def new_service():
+    """
+    A separate service object on the same credentials, for background
+    threads (googleapiclient/httplib2 objects are not thread-safe).
+    """
+    manager = get_credential_manager()
+    return manager.build_service(http=manager.new_http())
+
+
+def _new_message(to_email, subject, body):
     message = MIMEText(body)
     message["to"] = to_email
     message["subject"] = subject
 
     raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
-    message_body = {"raw": raw}
+    return {"raw": raw}
+
+
+def send_email(service, to_email, subject, body):
+    message_body = _new_message(to_email, subject, body)
 
-    sent = (
+    sent = execute(
         service.users()
         .messages()
         .send(userId="me", body=message_body)
-        .execute()
     )
 
     return sent["id"]
 def get_latest_email(service):
-    results = (
+    results = execute(
         service.users()
         .messages()
         .list(userId="me", maxResults=1, labelIds=["INBOX"])
-        .execute()
     )
 
     messages = results.get("messages", [])
@@ -61,108 +89,120 @@ def get_latest_email(service):
 
     msg_id = messages[0]["id"]
 
-    message = (
+    message = execute(
         service.users()
         .messages()
-        .get(userId="me", id=msg_id, format="metadata")
-        .execute()
+        .get(userId="me", id=msg_id, format="metadata", metadataHeaders=LIST_HEADERS)
     )
 
-    headers = message["payload"]["headers"]
+    return _summarize(message)
 
-    subject = ""
-    sender = ""
 
-    for h in headers:
-        if h["name"] == "Subject":
-            subject = h["value"]
-        if h["name"] == "From":
-            sender = h["value"]
+def _header(message, name):
+    for h in message.get("payload", {}).get("headers", []):
+        if h["name"].lower() == name.lower():
+            return h["value"]
+    return ""
 
-    return {
-        "id": msg_id,
-        "subject": subject,
-        "from": sender
-    }
+
+def _summarize(message):
+    return EmailRecord.from_message(message)
+
+
+def get_messages(service, msg_ids, format="full", fields=None):
+    """
+    Fetch many messages with batch HTTP requests, one round-trip per
+    BATCH_SIZE ids. Results keep the order of ``msg_ids``; messages
+    that fail are skipped. ``fields`` restricts the response (partial
+    response syntax).
+    """
+    params = {"format": format}
+    if format == "metadata":
+        params["metadataHeaders"] = LIST_HEADERS
+    if fields:
+        params["fields"] = fields
+
+    results = {}
+    for start in range(0, len(msg_ids), BATCH_SIZE):
+        requests = {
+            msg_id: service.users().messages().get(userId="me", id=msg_id, **params)
+            for msg_id in msg_ids[start:start + BATCH_SIZE]
+        }
+        fetched, errors = get_transport().execute_batch(service, requests, "messages.get")
+        for msg_id, exception in errors.items():
+            print(f"Gmail fetch failed for {msg_id}: {exception}")
+        results.update(fetched)
+
+    return [results[i] for i in msg_ids if i in results]
+
+
+def get_messages_metadata(service, msg_ids):
+    """
+    Headers (LIST_HEADERS) + snippet + labels for many messages.
+    """
+    return get_messages(service, msg_ids, format="metadata")
+
+
+def load_email_body(service, email):
+    """
+    Fetch the full message for one listed email (lazily, when the user
+    picks it) and load its text parts into the record.
+    """
+    full = execute(service.users().messages().get(
+        userId="me",
+        id=email["id"],
+        format="full"
+    ))
+
+    return email.load(full)
 
 
 def delete_email(service, msg_id):
-    service.users().messages().trash(
+    execute(service.users().messages().trash(
         userId="me",
         id=msg_id
-    ).execute()
+    ))
     return True
 
 
 def get_emails_from_sender(service, sender_email, max_results=3):
     query = f"from:{sender_email}"
 
-    results = service.users().messages().list(
+    results = execute(service.users().messages().list(
         userId="me",
         q=query,
         maxResults=max_results
-    ).execute()
+    ))
 
     messages = results.get("messages", [])
-    emails = []
-
-    for msg in messages:
-        full = service.users().messages().get(
-            userId="me",
-            id=msg["id"],
-            format="full"
-        ).execute()
-
-        headers = full["payload"].get("headers", [])
-        subject = ""
-        sender = ""
+    return [_summarize(m) for m in get_messages_metadata(service, [m["id"] for m in messages])]
 
-        for h in headers:
-            if h["name"] == "Subject":
-                subject = h["value"]
-            elif h["name"] == "From":
-                sender = h["value"]
-
-        emails.append({
-            "id": msg["id"],
-            "subject": subject,
-            "from": sender,
-            "raw": full
-        })
-
-    return emails
-
-
-
-import base64
-from email.message import EmailMessage
 
 def reply_to_email(service, original_email, reply_text):
     """
     Reply to an email safely, even if 'raw' is missing.
     """
 
-    # 🔄 Ensure full message is available
-    if "raw" not in original_email:
-        msg = service.users().messages().get(
+    # 🔄 Ensure the original headers (incl. Message-ID) are available
+    if not _header(original_email.get("raw", {}), "Message-ID"):
+        msg = execute(service.users().messages().get(
             userId="me",
             id=original_email["id"],
             format="full"
-        ).execute()
+        ))
     else:
         msg = original_email["raw"]
 
-    headers = msg["payload"]["headers"]
+    execute(service.users().messages().send(
+        userId="me",
+        body=_reply_message(msg, reply_text)
+    ))
 
-    def get_header(name):
-        for h in headers:
-            if h["name"].lower() == name.lower():
-                return h["value"]
-        return ""
 
-    to_email = get_header("From")
-    subject = get_header("Subject")
-    message_id = get_header("Message-ID")
+def _reply_message(msg, reply_text):
+    to_email = _header(msg, "From")
+    subject = _header(msg, "Subject")
+    message_id = _header(msg, "Message-ID")
 
     reply_subject = subject if subject.lower().startswith("re:") else f"Re: {subject}"
 
@@ -173,58 +213,108 @@ def reply_to_email(service, original_email, reply_text):
     message["References"] = message_id
 
     raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
+    return {"raw": raw}
 
-    service.users().messages().send(
-        userId="me",
-        body={"raw": raw}
-    ).execute()
+def list_message_ids(service, query, page_size=500):
+    """
+    Every message id matching a Gmail search query, following
+    nextPageToken until the last page.
+    """
+    ids = []
+    page_token = None
 
-def get_read_emails(service, max_results=20):
-    results = service.users().messages().list(
-        userId="me",
-        q="-label:UNREAD",
-        maxResults=max_results
-    ).execute()
+    while True:
+        results = execute(service.users().messages().list(
+            userId="me",
+            q=query,
+            maxResults=page_size,
+            pageToken=page_token
+        ))
+
+        ids.extend(m["id"] for m in results.get("messages", []))
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            return ids
 
-    messages = results.get("messages", [])
-    return messages
+
+def _names_invalid_id(error) -> bool:
+    """
+    True if an HttpError rejects one of the ids rather than the whole
+    request (bad body, unknown label, ...).
+    """
+    if error.resp.status not in ID_ERROR_STATUSES:
+        return False
+    try:
+        message = json.loads(error.content)["error"].get("message", "")
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return False
+    return bool(_ID_MESSAGE.search(message))
+
+
+def trash_messages(service, msg_ids, on_progress=None, max_retries=3):
+    """
+    Move many messages to trash with users.messages.batchModify, up to
+    BATCH_MODIFY_SIZE ids per call.
+
+    Transient errors are retried by the transport. A chunk rejected
+    because of an id in it (400/404 naming the id) is split in half
+    until the bad id is isolated and skipped; any other error, a 400
+    rejecting the request itself included, stops the run at once.
+    ``on_progress`` is called as on_progress(done, total) after every
+    chunk. Returns the ids that were trashed.
+    """
+    total = len(msg_ids)
+    trashed = []
+    pending = [
+        msg_ids[i:i + BATCH_MODIFY_SIZE]
+        for i in range(0, total, BATCH_MODIFY_SIZE)
+    ]
+
+    while pending:
+        chunk = pending.pop(0)
+
+        try:
+            execute(service.users().messages().batchModify(
+                userId="me",
+                body={"ids": chunk, "addLabelIds": ["TRASH"]}
+            ), max_retries=max_retries)
+        except HttpError as e:
+            if not _names_invalid_id(e):
+                print(f"batchModify failed, stopping after {len(trashed)}/{total}: {e}")
+                break
+            if len(chunk) > 1:
+                half = len(chunk) // 2
+                pending[:0] = [chunk[:half], chunk[half:]]
+            else:
+                print(f"Skipping message {chunk[0]}: {e}")
+            continue
+
+        trashed.extend(chunk)
+        if on_progress:
+            on_progress(len(trashed), total)
+
+    return trashed
 
 
 def get_unread_emails(service, max_results=10):
-    results = service.users().messages().list(
+    results = execute(service.users().messages().list(
         userId="me",
         labelIds=["INBOX", "UNREAD"],
         maxResults=max_results
-    ).execute()
+    ))
 
     messages = results.get("messages", [])
-    emails = []
-
-    for msg in messages:
-        msg_data = service.users().messages().get(
-            userId="me",
-            id=msg["id"],
-            format="full"
-        ).execute()
-
-        headers = msg_data["payload"]["headers"]
-        subject = next((h["value"] for h in headers if h["name"] == "Subject"), "")
-        sender = next((h["value"] for h in headers if h["name"] == "From"), "")
+    return [_summarize(m) for m in get_messages_metadata(service, [m["id"] for m in messages])]
 
-        emails.append({
-            "id": msg["id"],
-            "from": sender,
-            "subject": subject,
-            "raw": msg_data
-        })
 
-    return emails
-
-import base64
-from email.message import EmailMessage
+def forward_email(service, email_obj, to_email):
+    execute(service.users().messages().send(
+        userId="me",
+        body=_forward_message(email_obj, to_email)
+    ))
 
 
-def forward_email(service, email_obj, to_email):
+def _forward_message(email_obj, to_email):
     msg = EmailMessage()
 
     subject = email_obj.get("subject", "")
@@ -247,8 +337,4 @@ def forward_email(service, email_obj, to_email):
     msg.set_content(forwarded_text)
 
     raw = base64.urlsafe_b64encode(msg.as_bytes()).decode()
-
-    service.users().messages().send(
-        userId="me",
-        body={"raw": raw}
-    ).execute()
+    return {"raw": raw}
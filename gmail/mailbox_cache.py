@@ -0,0 +1,408 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from googleapiclient.errors import HttpError
+
+from gmail.gmail_client import get_messages
+from gmail.mime import EmailRecord
+from gmail.transport import execute
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    thread_id TEXT,
+    internal_date INTEGER,
+    sender TEXT,
+    subject TEXT,
+    snippet TEXT,
+    raw TEXT
+);
+CREATE INDEX IF NOT EXISTS messages_date ON messages (internal_date DESC);
+
+CREATE TABLE IF NOT EXISTS labels (
+    message_id TEXT,
+    label TEXT,
+    PRIMARY KEY (message_id, label)
+);
+CREATE INDEX IF NOT EXISTS labels_label ON labels (label, message_id);
+
+CREATE TABLE IF NOT EXISTS attachments (
+    message_id TEXT,
+    part_id TEXT,
+    filename TEXT,
+    mime_type TEXT,
+    size INTEGER,
+    attachment_id TEXT,
+    PRIMARY KEY (message_id, part_id)
+);
+
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+HISTORY_TYPES = ["messageAdded", "messageDeleted", "labelAdded", "labelRemoved"]
+
+
+def _structure_fields(depth=6):
+    """
+    Partial-response ``fields`` for a "full" message without any body
+    data: headers, labels and the MIME tree (names, types, sizes and
+    attachment ids) down to ``depth`` levels.
+    """
+    part = "partId,mimeType,filename,headers,body(size,attachmentId)"
+    tree = part
+    for _ in range(depth - 1):
+        tree = f"{part},parts({tree})"
+    return f"id,threadId,labelIds,snippet,internalDate,payload({tree})"
+
+
+# What the mirror fetches per message: everything it stores, no bodies
+MIRROR_FIELDS = _structure_fields()
+
+
+class MailboxMirror:
+    """
+    Local SQLite copy of message metadata (headers, snippet, labels,
+    attachment descriptors).
+
+    The first sync stores the most recent messages and the mailbox
+    historyId; later syncs replay users.history.list from that id, so
+    each refresh costs one small request. Read queries never touch the
+    network and keep working while Gmail is unreachable.
+
+    With a ``service_factory`` the full copies (first sync, expired
+    history) run on a background thread; until one finishes
+    ``has_data()`` is False and callers should ask Gmail directly.
+    """
+
+    def __init__(self, db_path, initial_sync=500, min_sync_interval=30.0, service_factory=None):
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self.initial_sync = initial_sync
+        self.min_sync_interval = min_sync_interval
+        # builds a service for background full syncs (None = sync inline)
+        self.service_factory = service_factory
+        self._last_sync = 0.0
+        self._listeners = []
+        self._full_sync_thread = None
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript(SCHEMA)
+
+    # ---------- state ----------
+
+    def _get_state(self, key):
+        row = self._db.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _set_state(self, key, value):
+        self._db.execute(
+            "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+            (key, str(value)),
+        )
+
+    @property
+    def history_id(self):
+        with self._lock:
+            return self._get_state("history_id")
+
+    def has_data(self) -> bool:
+        return self.history_id is not None
+
+    # ---------- sync ----------
+
+    def add_listener(self, listener):
+        """
+        Call ``listener(service, changed_ids, deleted_ids)`` after every
+        sync that changed something (e.g. to update a search index).
+        ``deleted_ids`` also covers mail moved to trash or spam and mail
+        a full resync no longer holds, so listeners stay in step with
+        what the read queries return. Listeners run on the thread that
+        synced, the background full-sync thread included.
+        """
+        self._listeners.append(listener)
+
+    def sync(self, service, force=False):
+        """
+        Bring the mirror up to date. Returns the ids of messages that
+        were added or changed. Skipped if the last sync is more recent
+        than ``min_sync_interval`` unless ``force`` is set.
+        """
+        if not force and time.time() - self._last_sync < self.min_sync_interval:
+            return []
+
+        history_id = self.history_id
+        if history_id is None:
+            if self.service_factory:
+                self.start_full_sync()
+                return []
+            changed, deleted = self._resync(service)
+        else:
+            try:
+                changed, deleted = self._sync_history(service, history_id)
+            except HttpError as e:
+                # 404 = historyId too old, Gmail no longer has the delta
+                if e.resp.status != 404:
+                    raise
+                print("Mailbox history expired, resyncing")
+                if self.service_factory:
+                    # stale until the copy finishes: send reads to Gmail
+                    with self._lock, self._db:
+                        self._db.execute("DELETE FROM state WHERE key = 'history_id'")
+                    self.start_full_sync()
+                    return []
+                changed, deleted = self._resync(service)
+
+        self._last_sync = time.time()
+        self._notify(service, changed, deleted)
+        return changed
+
+    def start_full_sync(self):
+        """
+        Run a full copy on a background thread with its own service
+        (no-op while one is running).
+        """
+        with self._lock:
+            if self._full_sync_thread and self._full_sync_thread.is_alive():
+                return
+            self._full_sync_thread = threading.Thread(
+                target=self._background_full_sync, name="mailbox-sync", daemon=True
+            )
+            self._full_sync_thread.start()
+
+    def _background_full_sync(self):
+        try:
+            service = self.service_factory()
+            changed, deleted = self._resync(service)
+        except Exception as e:
+            print("Mailbox full sync failed:", e)
+            return
+        self._last_sync = time.time()
+        self._notify(service, changed, deleted)
+
+    def _resync(self, service):
+        """
+        Full copy; messages the mirror held before and no longer does
+        are reported as deleted.
+        """
+        previous = self._ids()
+        changed = self.full_sync(service)
+        return changed, sorted(previous - set(changed))
+
+    def _notify(self, service, changed, deleted):
+        if not (changed or deleted):
+            return
+        hidden = self._hidden_ids() & set(changed)
+        visible = [i for i in changed if i not in hidden]
+        removed = deleted + sorted(hidden)
+        for listener in self._listeners:
+            try:
+                listener(service, visible, removed)
+            except Exception as e:
+                print("Mailbox listener failed:", e)
+
+    def _ids(self):
+        with self._lock:
+            return {row["id"] for row in self._db.execute("SELECT id FROM messages")}
+
+    def _hidden_ids(self):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT message_id FROM labels WHERE label IN ('TRASH', 'SPAM')"
+            ).fetchall()
+        return {row["message_id"] for row in rows}
+
+    def invalidate(self):
+        """
+        Force the next sync() to hit Gmail (call after local changes).
+        """
+        self._last_sync = 0.0
+
+    def mark_trashed(self, msg_ids):
+        """
+        Apply a trash made through the API locally (TRASH added, INBOX
+        removed) so reads exclude it even before the next sync, and
+        force that sync.
+        """
+        with self._lock, self._db:
+            for msg_id in msg_ids:
+                self._db.execute(
+                    "DELETE FROM labels WHERE message_id = ? AND label = 'INBOX'", (msg_id,)
+                )
+                self._db.execute(
+                    "INSERT OR IGNORE INTO labels (message_id, label) VALUES (?, 'TRASH')", (msg_id,)
+                )
+        self.invalidate()
+
+    def full_sync(self, service):
+        # take the historyId first so changes made during the copy are replayed
+        profile = execute(service.users().getProfile(userId="me"))
+
+        ids = []
+        page_token = None
+        while len(ids) < self.initial_sync:
+            results = execute(service.users().messages().list(
+                userId="me",
+                maxResults=min(500, self.initial_sync - len(ids)),
+                pageToken=page_token,
+            ))
+            ids.extend(m["id"] for m in results.get("messages", []))
+            page_token = results.get("nextPageToken")
+            if not page_token:
+                break
+
+        messages = self._fetch(service, ids)
+
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM messages")
+            self._db.execute("DELETE FROM labels")
+            self._db.execute("DELETE FROM attachments")
+            for message in messages:
+                self._upsert(message)
+            self._set_state("history_id", profile["historyId"])
+
+        return [m["id"] for m in messages]
+
+    def _sync_history(self, service, history_id):
+        added = set()
+        deleted = set()
+        relabeled = {}
+        latest = history_id
+        page_token = None
+
+        while True:
+            results = execute(service.users().history().list(
+                userId="me",
+                startHistoryId=history_id,
+                historyTypes=HISTORY_TYPES,
+                pageToken=page_token,
+            ))
+
+            for record in results.get("history", []):
+                for item in record.get("messagesAdded", []):
+                    added.add(item["message"]["id"])
+                    deleted.discard(item["message"]["id"])
+                for item in record.get("messagesDeleted", []):
+                    deleted.add(item["message"]["id"])
+                    added.discard(item["message"]["id"])
+                for item in record.get("labelsAdded", []) + record.get("labelsRemoved", []):
+                    message = item["message"]
+                    relabeled[message["id"]] = message.get("labelIds", [])
+
+            latest = results.get("historyId", latest)
+            page_token = results.get("nextPageToken")
+            if not page_token:
+                break
+
+        messages = self._fetch(service, sorted(added))
+
+        with self._lock, self._db:
+            for message in messages:
+                self._upsert(message)
+            for msg_id, labels in relabeled.items():
+                if msg_id not in added and msg_id not in deleted:
+                    self._set_labels(msg_id, labels)
+            for msg_id in deleted:
+                self._db.execute("DELETE FROM messages WHERE id = ?", (msg_id,))
+                self._db.execute("DELETE FROM labels WHERE message_id = ?", (msg_id,))
+                self._db.execute("DELETE FROM attachments WHERE message_id = ?", (msg_id,))
+            self._set_state("history_id", latest)
+
+        changed = [m["id"] for m in messages] + [i for i in relabeled if i not in deleted]
+        return changed, sorted(deleted)
+
+    def _fetch(self, service, ids):
+        """
+        Headers, labels and MIME structure (for attachment descriptors)
+        of ``ids``, with all body data left out of the response.
+        """
+        return get_messages(service, ids, format="full", fields=MIRROR_FIELDS)
+
+    def _upsert(self, message):
+        record = EmailRecord.from_message(message)
+        self._db.execute(
+            "INSERT OR REPLACE INTO messages "
+            "(id, thread_id, internal_date, sender, subject, snippet, raw) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                record.id,
+                record.thread_id,
+                int(message.get("internalDate", 0)),
+                record.sender,
+                record.subject,
+                record.snippet,
+                json.dumps(record.raw),  # headers only, bodies are not kept
+            ),
+        )
+        self._set_labels(record.id, record.labels)
+        self._db.execute("DELETE FROM attachments WHERE message_id = ?", (record.id,))
+        self._db.executemany(
+            "INSERT OR REPLACE INTO attachments "
+            "(message_id, part_id, filename, mime_type, size, attachment_id) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (record.id, a["part_id"], a["filename"], a["mime_type"], a["size"], a["attachment_id"])
+                for a in record.attachments or []
+            ],
+        )
+
+    def _set_labels(self, msg_id, labels):
+        self._db.execute("DELETE FROM labels WHERE message_id = ?", (msg_id,))
+        self._db.executemany(
+            "INSERT INTO labels (message_id, label) VALUES (?, ?)",
+            [(msg_id, label) for label in labels],
+        )
+
+    # ---------- queries ----------
+
+    def _query(self, where, params, limit):
+        sql = (
+            "SELECT id, raw FROM messages "
+            f"WHERE {where} ORDER BY internal_date DESC LIMIT ?"
+        )
+        with self._lock:
+            rows = self._db.execute(sql, (*params, limit)).fetchall()
+            records = [EmailRecord.from_message(json.loads(row["raw"])) for row in rows]
+            for record in records:
+                record.attachments = self.attachments(record.id)
+        return records
+
+    def attachments(self, msg_id):
+        """
+        Attachment descriptors stored for a message (no network).
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT filename, mime_type, size, attachment_id, part_id "
+                "FROM attachments WHERE message_id = ? ORDER BY part_id",
+                (msg_id,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def _with_label(label):
+        return f"id IN (SELECT message_id FROM labels WHERE label = '{label}')"
+
+    def _visible(self, where):
+        # trashed mail can keep INBOX until the next sync relabels it
+        return f"{where} AND NOT {self._with_label('TRASH')} AND NOT {self._with_label('SPAM')}"
+
+    def latest(self):
+        emails = self._query(self._visible(self._with_label("INBOX")), (), 1)
+        return emails[0] if emails else None
+
+    def unread(self, limit=10):
+        where = f"{self._with_label('INBOX')} AND {self._with_label('UNREAD')}"
+        return self._query(self._visible(where), (), limit)
+
+    def from_sender(self, sender, limit=3):
+        pattern = sender.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        where = self._visible("sender LIKE ? ESCAPE '\\' COLLATE NOCASE")
+        return self._query(where, (f"%{pattern}%",), limit)
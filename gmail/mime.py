@@ -0,0 +1,253 @@
+import base64
+
+# Headers kept on a record (reply_to_email needs Message-ID)
+KEPT_HEADERS = {"from", "subject", "date", "message-id"}
+
+
+def decode_base64url(data: str) -> str:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4)).decode("utf-8", errors="replace")
+
+
+def _part_headers(part):
+    return {h["name"].lower(): h["value"] for h in part.get("headers", [])}
+
+
+def is_attachment(part) -> bool:
+    """
+    A part the user would call an attachment: it has a file name and
+    is not an image embedded in the HTML (inline with a Content-ID).
+    """
+    if not part.get("filename"):
+        return False
+    headers = _part_headers(part)
+    disposition = headers.get("content-disposition", "").lower()
+    return not ("content-id" in headers and disposition.startswith("inline"))
+
+
+def _is_file_part(part) -> bool:
+    return bool(part.get("filename")) or "attachmentId" in part.get("body", {})
+
+
+def describe_attachment(part) -> dict:
+    """
+    Descriptor of an attachment part. Gmail sends small files inline
+    (``body.data``, no attachmentId); their still-encoded data is kept
+    in ``data`` since there is nothing to download them with later.
+    """
+    body = part.get("body", {})
+    return {
+        "filename": part.get("filename", ""),
+        "mime_type": part.get("mimeType", "application/octet-stream"),
+        "size": body.get("size", 0),
+        "attachment_id": body.get("attachmentId"),
+        "part_id": part.get("partId"),
+        "data": body.get("data"),
+    }
+
+
+def is_downloadable(attachment) -> bool:
+    """
+    True if the attachment can be saved: it has an attachment id, or
+    its data came inline with the message.
+    """
+    return bool(attachment.get("attachment_id") or attachment.get("data"))
+
+
+def iter_parts(payload):
+    """
+    Depth-first walk over a Gmail payload tree in document order,
+    yielding one part at a time so callers can stop early.
+    """
+    stack = [payload]
+    while stack:
+        part = stack.pop()
+        yield part
+        stack.extend(reversed(part.get("parts", [])))
+
+
+def scan_payload(payload):
+    """
+    One walk over the MIME tree. Returns the still-encoded data of the
+    first text/plain and text/html body parts and a descriptor per
+    attachment, as (plain, html, attachments). Nothing is decoded and
+    attachment data is never touched.
+    """
+    plain = html = None
+    attachments = []
+    for part in iter_parts(payload):
+        if is_attachment(part):
+            attachments.append(describe_attachment(part))
+            continue
+        mime = part.get("mimeType", "")
+        if mime not in ("text/plain", "text/html") or _is_file_part(part):
+            continue
+        data = part.get("body", {}).get("data")
+        if data is None:
+            continue
+        if mime == "text/plain" and plain is None:
+            plain = data
+        elif mime == "text/html" and html is None:
+            html = data
+    return plain, html, attachments
+
+
+class EmailRecord:
+    """
+    Compact view of one Gmail message.
+
+    Keeps the list headers, snippet, labels and attachment descriptors,
+    plus the still-encoded text/plain and text/html parts; everything
+    else in the API response (other headers, MIME tree, attachment
+    data other than small inline files) is dropped. A body is base64url-decoded on first access only.
+
+    Supports ``record["from"]``, ``record.get("body")`` and item
+    assignment so code written for the old email dicts keeps working.
+    """
+
+    __slots__ = (
+        "id", "thread_id", "sender", "subject", "date", "message_id",
+        "snippet", "labels", "attachments", "_plain", "_html", "_decoded",
+    )
+
+    _KEYS = {
+        "id": "id",
+        "from": "sender",
+        "subject": "subject",
+        "snippet": "snippet",
+        "labels": "labels",
+        "attachments": "attachments",
+        "body": "body",
+        "html": "html",
+        "raw": "raw",
+    }
+
+    def __init__(self, id, sender="", subject="", snippet=""):
+        self.id = id
+        self.thread_id = None
+        self.sender = sender
+        self.subject = subject
+        self.date = ""
+        self.message_id = ""
+        self.snippet = snippet
+        self.labels = ()
+        self.attachments = None  # unknown until a "full" message is loaded
+        self._plain = None
+        self._html = None
+        self._decoded = 0  # bit 1 = _plain decoded, bit 2 = _html decoded
+
+    @classmethod
+    def from_message(cls, message):
+        record = cls(message["id"])
+        record.load(message)
+        return record
+
+    def load(self, message):
+        """
+        Take headers, snippet, labels and (for "full" messages) the
+        text parts from a users.messages.get response.
+        """
+        self.thread_id = message.get("threadId", self.thread_id)
+        self.snippet = message.get("snippet", self.snippet)
+        self.labels = tuple(message.get("labelIds", self.labels))
+
+        payload = message.get("payload", {})
+        headers = {
+            h["name"].lower(): h["value"]
+            for h in payload.get("headers", [])
+            if h["name"].lower() in KEPT_HEADERS
+        }
+        self.sender = headers.get("from", self.sender)
+        self.subject = headers.get("subject", self.subject)
+        self.date = headers.get("date", self.date)
+        self.message_id = headers.get("message-id", self.message_id)
+
+        if "parts" in payload or "data" in payload.get("body", {}):
+            self._plain, self._html, self.attachments = scan_payload(payload)
+            self._decoded = 0
+        return self
+
+    def merge(self, other):
+        """
+        Copy the loaded body of another record for the same message.
+        """
+        self._plain, self._html, self._decoded = other._plain, other._html, other._decoded
+        self.attachments = other.attachments
+        self.snippet = other.snippet or self.snippet
+        self.message_id = other.message_id or self.message_id
+        return self
+
+    @property
+    def body(self):
+        if self._plain is not None and not self._decoded & 1:
+            self._plain = decode_base64url(self._plain)
+            self._decoded |= 1
+        return self._plain
+
+    @body.setter
+    def body(self, text):
+        self._plain = text
+        self._decoded |= 1
+
+    @property
+    def html(self):
+        if self._html is not None and not self._decoded & 2:
+            self._html = decode_base64url(self._html)
+            self._decoded |= 2
+        return self._html
+
+    @html.setter
+    def html(self, text):
+        self._html = text
+        self._decoded |= 2
+
+    @property
+    def raw(self):
+        """
+        Minimal Gmail-style message (headers, snippet, labels) for code
+        that reads ``email["raw"]``.
+        """
+        headers = [
+            {"name": name, "value": value}
+            for name, value in (
+                ("From", self.sender),
+                ("Subject", self.subject),
+                ("Date", self.date),
+                ("Message-ID", self.message_id),
+            )
+            if value
+        ]
+        return {
+            "id": self.id,
+            "threadId": self.thread_id,
+            "snippet": self.snippet,
+            "labelIds": list(self.labels),
+            "payload": {"headers": headers},
+        }
+
+    @raw.setter
+    def raw(self, message):
+        self.load(message)
+
+    # ---------- dict compatibility ----------
+
+    def __getitem__(self, key):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, self._KEYS[key])
+
+    def __setitem__(self, key, value):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        setattr(self, self._KEYS[key], value)
+
+    def __contains__(self, key):
+        return key in self._KEYS
+
+    def get(self, key, default=None):
+        if key not in self._KEYS:
+            return default
+        value = self[key]
+        return default if value is None else value
+
+    def __repr__(self):
+        return f"EmailRecord(id={self.id!r}, from={self.sender!r}, subject={self.subject!r})"
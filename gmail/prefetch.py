@@ -0,0 +1,80 @@
+import re
+
+from gmail.async_client import get_async_gmail, run_async
+from gmail.mime import EmailRecord
+from utils.email_analyzer import html_to_text
+
+_FIRST_SENTENCE = re.compile(r"^(.{20,240}?[.!?])\s")
+
+
+def split_first_sentence(text: str):
+    """
+    Split off the first sentence so it can be pre-rendered on its own.
+    Returns (first, rest); ``first`` is "" when there is no clear break.
+    """
+    text = " ".join(text.split())
+    m = _FIRST_SENTENCE.match(text)
+    if not m:
+        return "", text
+    return m.group(1), text[m.end():]
+
+
+def readable_text(email) -> str:
+    if email.get("body"):
+        return email["body"]
+    if email.get("html"):
+        return html_to_text(email["html"])
+    return ""
+
+
+class Prefetcher:
+    """
+    Speculatively fetch full bodies for the top candidates of a list
+    while the list is being read out, so the picked email can be read
+    without waiting for Gmail.
+
+    With ``prepare_speech`` (e.g. tts.speaker.prepare_async) the first
+    sentence of each body is also synthesized ahead of time.
+    """
+
+    def __init__(self, max_candidates=3, prepare_speech=None):
+        self.max_candidates = max_candidates
+        self.prepare_speech = prepare_speech
+        self._futures = {}
+
+    def start(self, emails):
+        client = get_async_gmail()
+        for email in emails[:self.max_candidates]:
+            future = run_async(client.load_email_body(EmailRecord(email["id"])))
+            if self.prepare_speech:
+                future.add_done_callback(self._prepare)
+            self._futures[email["id"]] = future
+
+    def _prepare(self, future):
+        if future.cancelled() or future.exception():
+            return
+        first, _ = split_first_sentence(readable_text(future.result()))
+        if first:
+            self.prepare_speech(first)
+
+    def get(self, email, timeout=5.0):
+        """
+        Fill ``email`` with the prefetched body. Returns False if it was
+        not prefetched or the fetch failed.
+        """
+        future = self._futures.get(email["id"])
+        if future is None:
+            return False
+        try:
+            loaded = future.result(timeout=timeout)
+        except Exception as e:
+            print("Prefetch failed:", e)
+            return False
+
+        email.merge(loaded)
+        return True
+
+    def cancel(self):
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
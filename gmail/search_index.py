@@ -0,0 +1,148 @@
+import os
+import queue
+import re
+import sqlite3
+import threading
+
+from gmail.gmail_client import get_messages
+from gmail.mime import EmailRecord
+from utils.email_analyzer import html_to_text
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS email_fts USING fts5(
+    message_id UNINDEXED,
+    subject,
+    sender,
+    body,
+    tokenize = 'porter unicode61'
+);
+CREATE TABLE IF NOT EXISTS indexed (
+    message_id TEXT PRIMARY KEY
+);
+"""
+
+# Column weights for bm25(): message_id, subject, sender, body
+RANK = "bm25(email_fts, 0.0, 5.0, 3.0, 1.0)"
+
+# Bodies are cut to this many characters before indexing
+MAX_BODY_CHARS = 20000
+
+
+class SearchIndex:
+    """
+    On-disk SQLite FTS5 index over subject, sender and plain-text body.
+
+    New messages are added incrementally (``on_mailbox_change`` is a
+    MailboxMirror listener); queries are answered locally and ranked
+    by BM25. With a ``service_factory`` the bodies are downloaded on a
+    background worker with its own service, so a sync never waits for
+    indexing.
+    """
+
+    def __init__(self, db_path, service_factory=None):
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self.service_factory = service_factory
+        self._pending = queue.Queue()
+        self._thread = None
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript(SCHEMA)
+
+    def is_indexed(self, msg_id) -> bool:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM indexed WHERE message_id = ?", (msg_id,)
+            ).fetchone()
+        return row is not None
+
+    def add_messages(self, service, msg_ids):
+        """
+        Fetch and index the messages in ``msg_ids`` that are not indexed
+        yet; only those are downloaded in full.
+        """
+        missing = [i for i in msg_ids if not self.is_indexed(i)]
+        if not missing:
+            return 0
+
+        messages = get_messages(service, missing, format="full")
+        with self._lock, self._db:
+            for message in messages:
+                self._add(message)
+        return len(messages)
+
+    def _add(self, message):
+        record = EmailRecord.from_message(message)
+        body = record.body or html_to_text(record.html or "", max_chars=MAX_BODY_CHARS)
+
+        self._db.execute(
+            "INSERT INTO email_fts (message_id, subject, sender, body) VALUES (?, ?, ?, ?)",
+            (record.id, record.subject, record.sender, body[:MAX_BODY_CHARS]),
+        )
+        self._db.execute(
+            "INSERT OR IGNORE INTO indexed (message_id) VALUES (?)", (record.id,)
+        )
+
+    def on_mailbox_change(self, service, changed_ids, deleted_ids):
+        """
+        MailboxMirror listener: drop deleted mail at once, index new
+        mail (on the worker when there is a service factory).
+        """
+        self.remove(deleted_ids)
+        if self.service_factory is None:
+            self.add_messages(service, changed_ids)
+            return
+        if changed_ids or deleted_ids:
+            # deletions are queued too, so they stay ordered after
+            # additions of the same ids that are still waiting
+            self._pending.put((list(changed_ids), list(deleted_ids)))
+            self._start_worker()
+
+    def _start_worker(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="search-index", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        service = None
+        while True:
+            changed_ids, deleted_ids = self._pending.get()
+            try:
+                if service is None:
+                    service = self.service_factory()
+                self.add_messages(service, changed_ids)
+                self.remove(deleted_ids)
+            except Exception as e:
+                print("Search indexing failed:", e)
+
+    def remove(self, msg_ids):
+        with self._lock, self._db:
+            for msg_id in msg_ids:
+                self._db.execute("DELETE FROM email_fts WHERE message_id = ?", (msg_id,))
+                self._db.execute("DELETE FROM indexed WHERE message_id = ?", (msg_id,))
+
+    def search(self, text, limit=5):
+        """
+        Best matches for a spoken query, most relevant first.
+        Every word must appear (in any indexed column).
+        """
+        words = re.findall(r"\w+", text.lower())
+        if not words:
+            return []
+
+        match = " ".join(f'"{w}"' for w in words)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT message_id, subject, sender, "
+                "snippet(email_fts, 3, '', '', '...', 16) AS excerpt "
+                f"FROM email_fts WHERE email_fts MATCH ? ORDER BY {RANK} LIMIT ?",
+                (match, limit),
+            ).fetchall()
+
+        return [
+            EmailRecord(row["message_id"], row["sender"], row["subject"], row["excerpt"])
+            for row in rows
+        ]
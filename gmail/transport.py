@@ -0,0 +1,407 @@
+import asyncio
+import json
+import random
+import threading
+import time
+
+import httplib2
+from google.auth.exceptions import TransportError
+from googleapiclient.errors import HttpError
+
+from config.settings import (
+    GMAIL_QUOTA_UNITS_PER_SECOND,
+    GMAIL_MAX_RETRIES,
+    GMAIL_BACKOFF_BASE_SECONDS,
+    GMAIL_BACKOFF_MAX_SECONDS,
+    GMAIL_BREAKER_FAILURES,
+    GMAIL_BREAKER_RESET_SECONDS,
+)
+
+# Quota units per call (Gmail API usage limits); unknown methods cost 5
+QUOTA_UNITS = {
+    "getProfile": 1,
+    "history.list": 2,
+    "messages.list": 5,
+    "messages.get": 5,
+    "messages.trash": 5,
+    "messages.modify": 5,
+    "messages.attachments.get": 5,
+    "messages.batchModify": 50,
+    "messages.send": 100,
+}
+DEFAULT_QUOTA_UNITS = 5
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+RETRY_REASONS = RATE_LIMIT_REASONS | {"backendError"}
+
+# Calls that must not run twice. Once the request may have reached
+# Gmail (network error, 5xx) they are not retried, only when Gmail
+# refused them outright with a rate limit.
+NON_IDEMPOTENT = {"messages.send"}
+
+# Exceptions raised when Gmail could not be reached at all
+NETWORK_ERRORS = (OSError, TimeoutError, httplib2.ServerNotFoundError, TransportError)
+
+
+class GmailUnavailable(Exception):
+    """
+    Raised instead of calling Gmail while the circuit breaker is open.
+    """
+
+
+class TokenBucket:
+    """
+    Quota-unit limiter. Callers reserve units and get back how long to
+    wait; a reservation larger than the bucket is allowed and simply
+    waits longer, so batch calls are never refused.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, units) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= units
+            return max(0.0, -self._tokens / self.rate)
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failures`` consecutive transient failures and rejects
+    calls for ``reset_seconds``. After that one trial call is let
+    through: success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, failures=5, reset_seconds=30.0):
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self._count = 0
+        self._opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half-open"
+            return "open"
+
+    def before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._trial:
+                raise GmailUnavailable("Gmail is not responding, try again shortly")
+            self._trial = True
+
+    def record_success(self):
+        with self._lock:
+            self._count = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._count += 1
+            if self._trial or self._count >= self.failures:
+                self._opened_at = time.monotonic()
+            self._trial = False
+
+
+class TransportMetrics:
+    """
+    Per-method counters: calls, retries, failures, quota units and
+    seconds spent waiting (backoff and rate limiting).
+    """
+
+    FIELDS = ("calls", "retries", "failures", "quota_units", "backoff_seconds", "throttle_seconds")
+
+    def __init__(self):
+        self._methods = {}
+        self._lock = threading.Lock()
+
+    def add(self, method, **counts):
+        with self._lock:
+            stats = self._methods.setdefault(method, dict.fromkeys(self.FIELDS, 0))
+            for key, value in counts.items():
+                stats[key] += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {method: dict(stats) for method, stats in self._methods.items()}
+
+    def totals(self) -> dict:
+        totals = dict.fromkeys(self.FIELDS, 0)
+        for stats in self.snapshot().values():
+            for key, value in stats.items():
+                totals[key] += value
+        return totals
+
+    def summary(self) -> str:
+        t = self.totals()
+        return (
+            f"Gmail: {t['calls']} calls, {t['quota_units']} quota units, "
+            f"{t['retries']} retries, {t['failures']} failures, "
+            f"{t['backoff_seconds']:.1f}s backoff, {t['throttle_seconds']:.1f}s throttled"
+        )
+
+
+def _error_reason(content) -> str:
+    try:
+        error = json.loads(content)["error"]
+        errors = error.get("errors") or [{}]
+        return errors[0].get("reason") or error.get("status", "")
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return ""
+
+
+def is_retryable(status, reason="") -> bool:
+    if status in RETRY_STATUSES:
+        return True
+    return status == 403 and reason in RETRY_REASONS
+
+
+def is_rate_limited(status, reason="") -> bool:
+    return status == 429 or (status == 403 and reason in RATE_LIMIT_REASONS)
+
+
+def _retry_after(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _method_name(request) -> str:
+    method_id = getattr(request, "methodId", "") or ""
+    return method_id.replace("gmail.users.", "", 1) or "unknown"
+
+
+class GmailTransport:
+    """
+    Runs every Gmail API call through a token-bucket limiter, a circuit
+    breaker and retries with jittered exponential backoff on 429/5xx,
+    rate-limit 403s and network errors (sends: rate limits only).
+    Shared by the sync service calls, batch requests and the async
+    client.
+    """
+
+    def __init__(
+        self,
+        units_per_second=GMAIL_QUOTA_UNITS_PER_SECOND,
+        max_retries=GMAIL_MAX_RETRIES,
+        backoff_base=GMAIL_BACKOFF_BASE_SECONDS,
+        backoff_max=GMAIL_BACKOFF_MAX_SECONDS,
+        breaker=None,
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.limiter = TokenBucket(units_per_second)
+        self.breaker = breaker or CircuitBreaker(GMAIL_BREAKER_FAILURES, GMAIL_BREAKER_RESET_SECONDS)
+        self.metrics = TransportMetrics()
+
+    def backoff(self, attempt, retry_after=None) -> float:
+        """
+        Full-jitter delay for retry ``attempt`` (0-based); a server
+        Retry-After is used as the lower bound.
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    def _reserve(self, method, calls):
+        units = QUOTA_UNITS.get(method, DEFAULT_QUOTA_UNITS) * calls
+        wait = self.limiter.reserve(units)
+        self.metrics.add(method, calls=calls, quota_units=units, throttle_seconds=wait)
+        return wait
+
+    def _classify(self, error, method):
+        """
+        (transient, retryable, retry_after) for an exception raised by a
+        call. Transient errors count toward the circuit breaker; they
+        are retried unless ``method`` is NON_IDEMPOTENT.
+        """
+        if isinstance(error, HttpError):
+            status = error.resp.status
+            reason = _error_reason(error.content)
+            transient = is_retryable(status, reason)
+            if method in NON_IDEMPOTENT:
+                retryable = is_rate_limited(status, reason)
+            else:
+                retryable = transient
+            return transient, retryable, _retry_after(error.resp.get("retry-after"))
+        if isinstance(error, NETWORK_ERRORS):
+            return True, method not in NON_IDEMPOTENT, None
+        return False, False, None
+
+    def execute(self, request, method=None, max_retries=None):
+        """
+        ``request.execute()`` with rate limiting and retries.
+        """
+        method = method or _method_name(request)
+        max_retries = self.max_retries if max_retries is None else max_retries
+
+        for attempt in range(max_retries + 1):
+            self.breaker.before_call()
+            time.sleep(self._reserve(method, 1))
+            try:
+                result = request.execute()
+            except Exception as e:
+                transient, retryable, retry_after = self._classify(e, method)
+                if not transient:
+                    self.breaker.record_success()  # the API answered
+                    raise
+                self.breaker.record_failure()
+                if not retryable or attempt == max_retries:
+                    self.metrics.add(method, failures=1)
+                    raise
+                delay = self.backoff(attempt, retry_after)
+                self.metrics.add(method, retries=1, backoff_seconds=delay)
+                print(f"Gmail {method} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            return result
+
+    def execute_batch(self, service, requests, method, max_retries=None):
+        """
+        Run ``{request_id: request}`` as batch HTTP requests of at most
+        ``len(requests)`` calls. Sub-requests that fail with a transient
+        error are retried in a smaller follow-up batch.
+
+        Returns (results, errors), both keyed by request id.
+        """
+        max_retries = self.max_retries if max_retries is None else max_retries
+        results = {}
+        errors = {}
+        pending = dict(requests)
+
+        for attempt in range(max_retries + 1):
+            retry = {}
+            retry_after = None
+
+            def callback(request_id, response, exception):
+                nonlocal retry_after
+                if exception is None:
+                    results[request_id] = response
+                    errors.pop(request_id, None)
+                    return
+                errors[request_id] = exception
+                _, retryable, after = self._classify(exception, method)
+                if retryable:
+                    retry[request_id] = pending[request_id]
+                    retry_after = max(retry_after or 0, after or 0) or None
+
+            batch = service.new_batch_http_request(callback=callback)
+            for request_id, request in pending.items():
+                batch.add(request, request_id=request_id)
+
+            self.breaker.before_call()
+            time.sleep(self._reserve(method, len(pending)))
+            try:
+                batch.execute()
+            except Exception as e:
+                _, retryable, retry_after = self._classify(e, method)
+                if not retryable:
+                    raise
+                retry = dict(pending)
+                for request_id in pending:
+                    errors[request_id] = e
+
+            if not retry:
+                self.breaker.record_success()
+                break
+            self.breaker.record_failure()
+            if attempt == max_retries:
+                self.metrics.add(method, failures=len(retry))
+                break
+
+            delay = self.backoff(attempt, retry_after)
+            self.metrics.add(method, retries=len(retry), backoff_seconds=delay)
+            print(f"Gmail batch {method}: {len(retry)} transient failures, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            pending = retry
+
+        return results, errors
+
+    async def execute_async(self, send, method, errors=(OSError,), max_retries=None):
+        """
+        Async variant for the httpx client: ``send()`` returns a
+        coroutine resolving to an httpx.Response, ``errors`` are the
+        network exceptions worth retrying. Returns the first response
+        that is not a transient error (or the last one). Successful
+        streamed responses are returned unread. NON_IDEMPOTENT methods
+        are only retried on rate limits, as in execute().
+        """
+        max_retries = self.max_retries if max_retries is None else max_retries
+        idempotent = method not in NON_IDEMPOTENT
+
+        for attempt in range(max_retries + 1):
+            self.breaker.before_call()
+            await asyncio.sleep(self._reserve(method, 1))
+            retry_after = None
+            try:
+                response = await send()
+            except errors as e:
+                failure = e
+                response = None
+                retryable = idempotent
+            else:
+                status = response.status_code
+                reason = ""
+                if status == 403:
+                    await response.aread()  # the reason is in the error body
+                    reason = _error_reason(response.content)
+                if not is_retryable(status, reason):
+                    self.breaker.record_success()
+                    return response
+                failure = f"HTTP {status}"
+                retry_after = _retry_after(response.headers.get("retry-after"))
+                retryable = idempotent or is_rate_limited(status, reason)
+                if retryable and attempt < max_retries:
+                    await response.aclose()
+
+            self.breaker.record_failure()
+            if not retryable or attempt == max_retries:
+                self.metrics.add(method, failures=1)
+                if response is None:
+                    raise failure
+                return response
+
+            delay = self.backoff(attempt, retry_after)
+            self.metrics.add(method, retries=1, backoff_seconds=delay)
+            print(f"Gmail {method} failed ({failure}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+_transport = None
+_lock = threading.Lock()
+
+
+def get_transport() -> GmailTransport:
+    global _transport
+    with _lock:
+        if _transport is None:
+            _transport = GmailTransport()
+    return _transport
+
+
+def execute(request, method=None, max_retries=None):
+    """
+    Execute a googleapiclient request through the shared transport.
+    """
+    return get_transport().execute(request, method, max_retries)
@@ -0,0 +1,185 @@
+import itertools
+import queue
+import threading
+
+from googleapiclient.errors import HttpError
+
+from gmail.gmail_client import get_messages_metadata, _header
+from gmail.transport import execute
+
+
+class NotificationSource:
+    """
+    Tells the watcher which messages are new. Subclasses run on their
+    own thread and call ``on_new(service, message_ids)``; HistoryPoller
+    is the default, a Pub/Sub ``users.watch`` receiver can replace it.
+    """
+
+    def start(self, on_new):
+        raise NotImplementedError
+
+    def stop(self):
+        pass
+
+
+class HistoryPoller(NotificationSource):
+    """
+    Polls users.history.list from the last seen historyId.
+
+    The delta request is tiny when nothing happened. The interval drops
+    to ``min_interval`` after new mail and doubles (up to
+    ``max_interval``) on every empty poll or error, so a quiet mailbox
+    costs a handful of requests per hour.
+
+    ``service_factory`` builds the service used on the poll thread
+    (googleapiclient services are not thread-safe); tests can hand in a
+    service backed by a fake history endpoint.
+    """
+
+    def __init__(self, service_factory, min_interval=20.0, max_interval=300.0, backoff=2.0):
+        self.service_factory = service_factory
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+        self.history_id = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, on_new):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(on_new,), name="gmail-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, on_new):
+        service = self.service_factory()
+        while not self._stop.is_set():
+            try:
+                new_ids = self.poll(service)
+            except Exception as e:
+                print("Mail watcher poll failed:", e)
+                new_ids = []
+                self._slow_down()
+
+            if new_ids:
+                self.interval = self.min_interval
+                try:
+                    on_new(service, new_ids)
+                except Exception as e:
+                    print("Mail watcher handler failed:", e)
+
+            self._stop.wait(self.interval)
+
+    def _slow_down(self):
+        self.interval = min(self.max_interval, self.interval * self.backoff)
+
+    def poll(self, service):
+        """
+        One history delta. Returns the ids of messages added to the
+        inbox since the previous poll (none on the first call, which
+        only records the starting historyId).
+        """
+        if self.history_id is None:
+            self.history_id = execute(service.users().getProfile(userId="me"))["historyId"]
+            return []
+
+        added = []
+        latest = self.history_id
+        page_token = None
+        try:
+            while True:
+                results = execute(service.users().history().list(
+                    userId="me",
+                    startHistoryId=self.history_id,
+                    historyTypes=["messageAdded"],
+                    labelId="INBOX",
+                    pageToken=page_token,
+                ))
+
+                for record in results.get("history", []):
+                    for item in record.get("messagesAdded", []):
+                        if item["message"]["id"] not in added:
+                            added.append(item["message"]["id"])
+
+                latest = results.get("historyId", latest)
+                page_token = results.get("nextPageToken")
+                if not page_token:
+                    break
+        except HttpError as e:
+            # 404 = historyId too old; start again from now
+            if e.resp.status != 404:
+                raise
+            self.history_id = None
+            return []
+
+        self.history_id = latest
+        if not added:
+            self._slow_down()
+        return added
+
+
+PRIORITY_IMPORTANT = 0
+PRIORITY_NORMAL = 1
+
+
+class MailWatcher:
+    """
+    Turns new-message notifications into spoken announcements.
+
+    Announcements wait in a priority queue (important mail first) and
+    are only spoken while the assistant is idle, so they never talk
+    over a conversation. ``on_new_mail`` is called for every batch,
+    e.g. to mark the mailbox mirror stale.
+    """
+
+    def __init__(self, source, announce, on_new_mail=None):
+        self.source = source
+        self.announce = announce
+        self.on_new_mail = on_new_mail
+        self._pending = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._idle = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.source.start(self._on_new)
+        self._thread = threading.Thread(target=self._run, name="mail-announce", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.source.stop()
+
+    def set_idle(self, idle: bool):
+        if idle:
+            self._idle.set()
+        else:
+            self._idle.clear()
+
+    def _on_new(self, service, message_ids):
+        if self.on_new_mail:
+            self.on_new_mail(message_ids)
+
+        for message in get_messages_metadata(service, message_ids):
+            labels = message.get("labelIds", [])
+            if "INBOX" not in labels or "UNREAD" not in labels:
+                continue
+            priority = PRIORITY_IMPORTANT if "IMPORTANT" in labels else PRIORITY_NORMAL
+            self._pending.put((priority, next(self._sequence), describe(message)))
+
+    def _run(self):
+        while True:
+            _, _, text = self._pending.get()
+            self._idle.wait()
+            self.announce(text)
+
+
+def describe(message) -> str:
+    sender = _header(message, "From") or "an unknown sender"
+    sender = sender.split("<")[0].strip().strip('"') or sender
+    subject = _header(message, "Subject")
+    if subject:
+        return f"New email from {sender} about {subject}."
+    return f"New email from {sender}."
@@ -1,22 +1,28 @@
+import re
+
 import ollama
 
+from config.settings import LLM_MODEL, LLM_KEEP_ALIVE
+
+_OPTIONS = {
+    "temperature": 0.1,     # deterministic, editing-only behavior
+    "num_predict": 200
+}
+
 
-def enhance_email_body(text: str) -> str:
+class EnhancementFailed(Exception):
     """
-    Enhance an email body by improving grammar, clarity, and logical flow
-    WITHOUT adding new information or changing meaning.
-
-    Safety guarantees:
-    - No hallucinated names, companies, institutes, greetings, or signatures
-    - Meaning remains exactly the same
-    - Output length is HARD-LIMITED to at most 2× input length
-    - If LLM fails, original text is returned unchanged
+    Raised when the model fails after part of the body was yielded;
+    the yielded sentences are not the whole email.
     """
 
-    if not text or not text.strip():
-        return text
 
-    prompt = f"""
+# End of a sentence: terminal punctuation followed by whitespace
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+")
+
+
+def _build_prompt(text: str) -> str:
+    return f"""
 You are an email text improver.
 
 STRICT RULES (DO NOT BREAK):
@@ -34,29 +40,84 @@ Original email body:
 Return ONLY the improved email body.
 """
 
-    try:
-        response = ollama.generate(
-            model="phi3:mini",
-            prompt=prompt,
-            options={
-                "temperature": 0.1,     # deterministic, editing-only behavior
-                "num_predict": 200
-            }
-        )
 
-        improved = response.get("response", "").strip()
+def stream_enhanced_email_body(text: str):
+    """
+    Improve grammar, clarity, and logical flow of an email body WITHOUT
+    adding new information or changing meaning.
+
+    Yields the improved body sentence by sentence while the model is
+    still generating, so read-back can start on the first sentence.
+    The 2× length limit is enforced on the fly: output past it is cut
+    and generation stops.
+
+    If the model fails or returns nothing, the original text is yielded
+    unchanged. If it fails midway, EnhancementFailed is raised: what was
+    yielded so far is only part of the body.
+    """
+
+    if not text or not text.strip():
+        if text:
+            yield text
+        return
 
+    max_length = len(text) * 2
+    emitted = 0
+    pending = ""
+
+    def take(sentence):
         # 🔒 HARD SAFETY ENFORCEMENT (DO NOT REMOVE)
-        max_length = len(text) * 2
-        if len(improved) > max_length:
-            improved = improved[:max_length]
+        nonlocal emitted
+        room = max_length - emitted
+        sentence = sentence[:room].strip()
+        if sentence:
+            emitted += len(sentence) + 1
+        return sentence
 
-        # If model returned nothing, fall back safely
-        if not improved:
-            return text
+    stream = None
+    try:
+        stream = ollama.generate(
+            model=LLM_MODEL,
+            keep_alive=LLM_KEEP_ALIVE,
+            prompt=_build_prompt(text),
+            options=_OPTIONS,
+            stream=True,
+        )
+
+        for chunk in stream:
+            pending += chunk.get("response", "")
+
+            while True:
+                m = _SENTENCE_END.search(pending)
+                if not m:
+                    break
+                sentence = take(pending[:m.end()])
+                pending = pending[m.end():]
+                if sentence:
+                    yield sentence
+                if emitted >= max_length:
+                    return
 
-        return improved
+            if emitted + len(pending.strip()) > max_length:
+                sentence = take(pending)
+                if sentence:
+                    yield sentence
+                return
 
-    except Exception:
+    except Exception as e:
+        if emitted:
+            raise EnhancementFailed(str(e)) from e
         # Absolute safety fallback
-        return text
+        yield text
+        return
+    finally:
+        # stop generation when we return early (length cap, caller quit)
+        if stream is not None:
+            stream.close()
+
+    sentence = take(pending)
+    if sentence:
+        yield sentence
+    elif emitted == 0:
+        # If model returned nothing, fall back safely
+        yield text
@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+
+from config.settings import (
+    INTENT_CACHE_SIZE,
+    INTENT_CACHE_TTL_SECONDS,
+    INTENT_CACHE_DIR,
+)
+from llm.intent_rules import normalize_utterance
+
+
+class IntentCache:
+    """
+    LRU + TTL cache of parsed intents keyed by the normalized utterance
+    (lowercase, no punctuation, no filler words).
+
+    An optional diskcache directory persists entries across restarts;
+    the in-memory LRU sits in front of it.
+    """
+
+    def __init__(self, max_size=256, ttl_seconds=86400, directory=None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        if directory:
+            import diskcache
+            self._disk = diskcache.Cache(directory)
+
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, text: str) -> str:
+        return normalize_utterance(text)
+
+    def get(self, text: str):
+        key = self.key(text)
+        if not key:
+            return None
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[1])
+            if entry:
+                del self._entries[key]
+
+        value = self._disk.get(key) if self._disk is not None else None
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store(key, value, now)
+            return dict(value)
+
+    def put(self, text: str, intent: dict):
+        key = self.key(text)
+        if not key:
+            # nothing left after normalizing (silence, a bare wake word)
+            return
+        with self._lock:
+            self._store(key, dict(intent), time.time())
+        if self._disk is not None:
+            self._disk.set(key, dict(intent), expire=self.ttl_seconds)
+
+    def _store(self, key, value, now):
+        self._entries[key] = (now + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+        if self._disk is not None:
+            self._disk.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+_cache = None
+
+
+def get_intent_cache() -> IntentCache:
+    global _cache
+    if _cache is None:
+        _cache = IntentCache(
+            max_size=INTENT_CACHE_SIZE,
+            ttl_seconds=INTENT_CACHE_TTL_SECONDS,
+            directory=INTENT_CACHE_DIR,
+        )
+    return _cache
@@ -1,10 +1,27 @@
 import ollama
 
+from config.settings import LLM_MODEL, LLM_KEEP_ALIVE, INTENT_FASTPATH_MIN_CONFIDENCE
+from llm.intent_cache import get_intent_cache
+from llm.intent_rules import match_intent
+from llm.intent_utils import normalize_intent
+
 
 def extract_intent(text: str) -> dict:
+    # ⚡ Rule-based fast path, the LLM only sees what it cannot handle
+    fast = match_intent(text)
+    if fast and fast["confidence"] >= INTENT_FASTPATH_MIN_CONFIDENCE:
+        return fast
+
+    # 🗂 Same phrasing seen before
+    cache = get_intent_cache()
+    cached = cache.get(text)
+    if cached:
+        return cached
+
     try:
         response = ollama.generate(
-            model="phi3:mini",
+            model=LLM_MODEL,
+            keep_alive=LLM_KEEP_ALIVE,
             prompt=f"""
 You are an intent extraction engine.
 
@@ -16,6 +33,7 @@ Allowed intents:
 - SUMMARIZE_LATEST_EMAIL
 - DELETE_LATEST_EMAIL
 - DELETE_EMAIL_FROM_SENDER
+- SEARCH_EMAILS
 - CANCEL
 
 Rules:
@@ -23,13 +41,14 @@ Rules:
 - If the user says "read mail from X" or "emails from X", use READ_EMAIL_FROM_SENDER and set "to" = X
 - If the user says "delete mail from X" or "remove emails from X", use DELETE_EMAIL_FROM_SENDER and set "to" = X
 - If the user says "delete mail" with no sender, use DELETE_LATEST_EMAIL
+- If the user says "emails about X", "search for X" or "find X", use SEARCH_EMAILS and set "query" = X
 - If no sender or unread keyword is mentioned, use READ_LATEST_EMAIL
 
 Voice command:
 {text}
 
 Return ONLY valid JSON with exactly these fields:
-intent, to, subject, body
+intent, to, subject, body, query
 """,
             format="json",
             options={
@@ -38,13 +57,19 @@ intent, to, subject, body
             }
         )
 
-        return response["response"]
+        intent = normalize_intent(response["response"])
+        if intent["intent"] and intent["intent"] != "UNKNOWN":
+            cache.put(text, intent)
+        return intent
 
     except Exception as e:
         print("LLM ERROR:", e)
+        if fast:
+            return fast
         return {
             "intent": "UNKNOWN",
             "to": None,
             "subject": None,
-            "body": None
+            "body": None,
+            "query": None
         }
@@ -0,0 +1,117 @@
+import re
+
+from config.commands import COMMAND_INTENTS
+
+# Words that carry no meaning for intent matching
+FILLER_WORDS = {
+    "please", "hey", "zara", "sara", "sarah", "can", "could", "would",
+    "you", "me", "my", "the", "a", "an", "um", "uh", "just", "now", "kindly",
+}
+
+_EMAIL = r"(?:e ?mails?|mails?|messages?|inbox)"
+_SENDER = r"(?P<to>[a-z0-9@.' ]+?)"
+_TOPIC = r"(?P<query>[a-z0-9@.' ]+?)"
+# The sender ends where a topic starts ("from john about taxes")
+_SENDER_END = r"(?: (?:about|regarding)\b.*)?$"
+# Mailbox actions there is no intent for ("mark it as unread")
+_UNSUPPORTED = r"(?!.*\b(?:mark|flag|star|archive|label|move)\b)"
+
+# (intent, pattern, confidence), checked in order; first match wins
+RULES = [
+    ("CANCEL", re.compile(r"^(?:cancel|never mind|nothing|forget it)$"), 0.95),
+    (
+        "DELETE_EMAIL_FROM_SENDER",
+        re.compile(rf"\b(?:delete|remove|trash)\b.*\b{_EMAIL}\b.*\bfrom {_SENDER}{_SENDER_END}"),
+        0.9,
+    ),
+    (
+        "DELETE_LATEST_EMAIL",
+        re.compile(rf"\b(?:delete|remove|trash) (?:latest|last|newest|this|that) {_EMAIL}$"),
+        0.9,
+    ),
+    # destructive verbs win over the read patterns, but a qualified
+    # delete ("delete unread emails") is left to the LLM
+    (
+        "DELETE_LATEST_EMAIL",
+        re.compile(rf"\b(?:delete|remove|trash)\b.*\b{_EMAIL}\b"),
+        0.6,
+    ),
+    (
+        "READ_EMAIL_FROM_SENDER",
+        re.compile(rf"\b{_EMAIL}\b.*\bfrom {_SENDER}{_SENDER_END}"),
+        0.9,
+    ),
+    (
+        "SEARCH_EMAILS",
+        re.compile(rf"\b{_EMAIL}\b.*\b(?:about|regarding|mentioning|containing) {_TOPIC}$"),
+        0.9,
+    ),
+    (
+        "SEARCH_EMAILS",
+        re.compile(rf"^(?:search|find|look)(?: for| up)? {_TOPIC}$"),
+        0.85,
+    ),
+    ("READ_UNREAD_EMAILS", re.compile(rf"^{_UNSUPPORTED}.*\bunread\b(?:.*\b{_EMAIL}\b)?"), 0.9),
+    ("SUMMARIZE_LATEST_EMAIL", re.compile(r"\bsummar(?:ize|ise|y)\b"), 0.9),
+    (
+        "SEND_EMAIL",
+        re.compile(rf"\b(?:send|write|compose)\b.*\b{_EMAIL}\b(?: to {_SENDER})?{_SENDER_END}"),
+        0.9,
+    ),
+    (
+        "READ_LATEST_EMAIL",
+        re.compile(rf"\b(?:read|check|open)\b.*\b(?:latest|last|newest|recent)\b.*\b{_EMAIL}\b"),
+        0.9,
+    ),
+    # keyword-only guesses, below the fast-path threshold
+    ("READ_UNREAD_EMAILS", re.compile(r"\bunread\b"), 0.5),
+    ("READ_LATEST_EMAIL", re.compile(rf"\b(?:read|check)\b.*\b{_EMAIL}\b"), 0.6),
+    ("DELETE_LATEST_EMAIL", re.compile(r"\b(?:delete|remove|trash)\b"), 0.5),
+    ("SEND_EMAIL", re.compile(r"\b(?:send|write|compose)\b"), 0.5),
+]
+
+
+def normalize_utterance(text: str) -> str:
+    """
+    Lowercase, strip punctuation and drop filler words.
+    """
+    text = re.sub(r"[^a-z0-9@.' ]+", " ", text.lower())
+    text = text.replace(". ", " ").strip(" .")
+    words = [w for w in text.split() if w not in FILLER_WORDS]
+    return " ".join(words)
+
+
+def match_intent(text: str) -> dict | None:
+    """
+    Match a command against exact phrases and patterns without the LLM.
+
+    Returns an intent dict (same fields as normalize_intent plus
+    ``confidence`` in 0..1) or None if nothing matched.
+    """
+    if not text:
+        return None
+
+    utterance = normalize_utterance(text)
+
+    intent = COMMAND_INTENTS.get(utterance)
+    if intent:
+        return _result(intent, None, 1.0)
+
+    for intent, pattern, confidence in RULES:
+        m = pattern.search(utterance)
+        if m:
+            slots = {k: v.strip() for k, v in m.groupdict().items() if v}
+            return _result(intent, slots.get("to"), confidence, slots.get("query"))
+
+    return None
+
+
+def _result(intent, to, confidence, query=None):
+    return {
+        "intent": intent,
+        "to": to,
+        "subject": None,
+        "body": None,
+        "query": query,
+        "confidence": confidence,
+    }
@@ -18,4 +18,7 @@ def normalize_intent(data):
         "to": clean(data.get("to")),
         "subject": clean(data.get("subject")),
         "body": clean(data.get("body")),
+        "query": clean(data.get("query")),
+        # rule matches carry a 0..1 score, LLM results None
+        "confidence": data.get("confidence"),
     }
@@ -0,0 +1,267 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import ollama
+
+from config.settings import (
+    LLM_MODEL,
+    LLM_KEEP_ALIVE,
+    SUMMARY_SENTENCES,
+    SUMMARY_ABSTRACTIVE_MIN_TOKENS,
+    SUMMARY_MAX_INPUT_TOKENS,
+    SUMMARY_MAX_OUTPUT_TOKENS,
+    SUMMARY_CACHE_DIR,
+)
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])[\"')\]]*\s+|\n{2,}")
+_WORD = re.compile(r"[a-z][a-z0-9']+")
+
+STOP_WORDS = set(
+    "a an and are as at be been but by can could do for from had has have he her "
+    "him his i if in into is it its me my no not of on or our she so than that the "
+    "their them then there these they this to too up us was we were what when which "
+    "who will with would you your".split()
+)
+
+_OPTIONS = {
+    "temperature": 0.2,
+    "num_predict": SUMMARY_MAX_OUTPUT_TOKENS,
+}
+
+
+def split_sentences(text: str):
+    parts = (" ".join(s.split()) for s in _SENTENCE_SPLIT.split(text))
+    return [s for s in parts if len(s) > 3]
+
+
+def _tfidf(sentences):
+    """
+    Row-normalized TF-IDF matrix, one row per sentence.
+    """
+    tokens = [[w for w in _WORD.findall(s.lower()) if w not in STOP_WORDS] for s in sentences]
+    vocab = {w: i for i, w in enumerate(sorted({w for t in tokens for w in t}))}
+    matrix = np.zeros((len(sentences), max(1, len(vocab))), dtype=np.float32)
+    for row, words in enumerate(tokens):
+        for w in words:
+            matrix[row, vocab[w]] += 1.0
+
+    df = np.count_nonzero(matrix, axis=0)
+    idf = np.log((1 + len(sentences)) / (1 + df)) + 1.0
+    matrix *= idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def rank_sentences(sentences, damping=0.85, iterations=50):
+    """
+    TextRank scores over TF-IDF cosine similarity.
+    """
+    n = len(sentences)
+    if n < 3:
+        return np.ones(n, dtype=np.float32)
+
+    vectors = _tfidf(sentences)
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0.0)
+    totals = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, totals, out=np.full_like(similarity, 1.0 / n), where=totals > 0)
+
+    scores = np.full(n, 1.0 / n, dtype=np.float32)
+    for _ in range(iterations):
+        updated = (1 - damping) / n + damping * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < 1e-6:
+            return updated
+        scores = updated
+    return scores
+
+
+def extractive_summary(text: str, max_sentences=SUMMARY_SENTENCES) -> str:
+    """
+    The ``max_sentences`` most central sentences, in their original order.
+    """
+    sentences = split_sentences(text)
+    if len(sentences) <= max_sentences:
+        return " ".join(sentences)
+
+    scores = rank_sentences(sentences)
+    top = sorted(np.argsort(-scores, kind="stable")[:max_sentences])
+    return " ".join(sentences[i] for i in top)
+
+
+# ---------- token budget ----------
+
+_encoding = None
+
+
+def _get_encoding():
+    """
+    The tiktoken encoding, or False when tiktoken is unavailable
+    (callers then estimate four characters per token).
+    """
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            print("tiktoken unavailable, estimating tokens:", e)
+            _encoding = False
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is False:
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    The first ``max_tokens`` tokens of text.
+    """
+    encoding = _get_encoding()
+    if encoding is False:
+        return text[:max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def fit_to_budget(text: str, max_tokens: int) -> str:
+    """
+    Shrink text to ``max_tokens`` by keeping its highest-ranked
+    sentences (in order) instead of cutting the tail off. When no
+    sentence fits (one long unpunctuated block) the text is cut at the
+    limit instead.
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    sentences = split_sentences(text)
+    scores = rank_sentences(sentences)
+    keep = []
+    used = 0
+    for i in np.argsort(-scores, kind="stable"):
+        cost = count_tokens(sentences[i]) + 1
+        if used + cost > max_tokens:
+            continue
+        keep.append(i)
+        used += cost
+    if not keep:
+        return truncate_tokens(text, max_tokens)
+    return " ".join(sentences[i] for i in sorted(keep))
+
+
+def _build_prompt(text: str) -> str:
+    return f"""
+Summarize this email in two or three short sentences for reading aloud.
+
+RULES:
+- Say who wants what and any dates, amounts or requests
+- Use ONLY facts from the email
+- No greeting, no preamble, no bullet points
+
+Email:
+{text}
+
+Return ONLY the summary.
+"""
+
+
+def abstractive_summary(text: str) -> str:
+    prompt = _build_prompt(fit_to_budget(text, SUMMARY_MAX_INPUT_TOKENS))
+    response = ollama.generate(
+        model=LLM_MODEL,
+        keep_alive=LLM_KEEP_ALIVE,
+        prompt=prompt,
+        options=_OPTIONS,
+    )
+    return " ".join(response["response"].split())
+
+
+# ---------- cache ----------
+
+
+class SummaryCache:
+    """
+    Summaries keyed by message id + hash of the text, so a changed
+    body is never answered from a stale entry. Optional diskcache
+    directory behind an in-memory LRU.
+    """
+
+    def __init__(self, max_size=128, directory=None):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        if directory:
+            import diskcache
+            self._disk = diskcache.Cache(directory)
+
+    @staticmethod
+    def key(msg_id, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{msg_id}:{digest}"
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        value = self._disk.get(key) if self._disk is not None else None
+        if value is not None:
+            self._store(key, value)
+        return value
+
+    def put(self, key, summary: str):
+        self._store(key, summary)
+        if self._disk is not None:
+            self._disk.set(key, summary)
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+_cache = None
+
+
+def get_summary_cache() -> SummaryCache:
+    global _cache
+    if _cache is None:
+        _cache = SummaryCache(directory=SUMMARY_CACHE_DIR)
+    return _cache
+
+
+def summarize_email(msg_id, text: str) -> str:
+    """
+    Spoken summary of an email body. Short mails are summarized
+    extractively (instant, no LLM); long ones go through the LLM with
+    the input cut to the token budget, falling back to the extractive
+    summary if the LLM fails. Results are cached.
+    """
+    if not text or not text.strip():
+        return ""
+
+    cache = get_summary_cache()
+    key = cache.key(msg_id, text)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    summary = ""
+    if count_tokens(text) >= SUMMARY_ABSTRACTIVE_MIN_TOKENS:
+        try:
+            summary = abstractive_summary(text)
+        except Exception as e:
+            print("LLM summary failed, using extractive:", e)
+    if not summary:
+        summary = extractive_summary(text)
+
+    cache.put(key, summary)
+    return summary
@@ -1,4 +1,5 @@
 import os
+import re
 import sys
 
 def app_path(*paths):
@@ -8,25 +9,55 @@ def app_path(*paths):
 def ensure_audio_path(path):
     os.makedirs(os.path.dirname(path), exist_ok=True)
 
-from audio.recorder import record_audio
+from audio.recorder import record_until_silence
+from audio.wake_listener import listen_for_wake_word
+from audio.keyword_spotter import create_spotter
+from audio.barge_in import speak_interruptible
 from stt.whisper_engine import transcribe
+from stt.constrained import (
+    recognize,
+    YES_NO_GRAMMAR,
+    NUMBER_GRAMMAR,
+    REPLY_ACTION_GRAMMAR,
+)
 from utils.contacts import resolve_contact
 from gmail.gmail_client import get_unread_emails
 from llm.intent_engine import extract_intent
 from llm.intent_utils import normalize_intent
-
+from llm.summarizer import summarize_email
+
+from core.startup import warm_up
+from gmail.async_client import get_async_gmail, run_async
+from gmail.mailbox_cache import MailboxMirror
+from gmail.search_index import SearchIndex
+from gmail.prefetch import Prefetcher, readable_text, split_first_sentence
+from gmail.watcher import HistoryPoller, MailWatcher
+from gmail.attachments import AttachmentTooLarge, get_attachment_store
+from gmail.mime import is_downloadable
+from gmail.transport import GmailUnavailable, get_transport
 from gmail.gmail_client import (
-    authenticate_gmail,
-    send_email,
+    new_service,
     get_latest_email,
     delete_email,
     get_emails_from_sender,
-    reply_to_email,
+    load_email_body,
 )
 
-from tts.speaker import speak
-from utils.email_analyzer import analyze_email, html_to_text
-import time
+from tts.speaker import speak, speak_async, prepare_async, is_speaking, PRIORITY_LOW
+from utils.email_analyzer import analyze_email
+from config.settings import (
+    SAVE_RECORDINGS,
+    MAILBOX_DB_PATH,
+    MAILBOX_INITIAL_SYNC,
+    MAILBOX_SYNC_INTERVAL_SECONDS,
+    SEARCH_DB_PATH,
+    PREFETCH_CANDIDATES,
+    WATCH_NEW_MAIL,
+    WATCH_MIN_INTERVAL_SECONDS,
+    WATCH_MAX_INTERVAL_SECONDS,
+    DICTATION_MAX_SECONDS,
+    DICTATION_SILENCE_SECONDS,
+)
 
 
 # 🔊 Wake words
@@ -39,107 +70,215 @@ EXIT_WORDS = ["cancel", "stop", "go to sleep", "sleep"]
 SHUTDOWN_WORDS = ["bye", "exit", "quit"]
 
 
-def is_wake_word(text: str) -> bool:
-    text = text.lower()
-    return any(wake in text for wake in WAKE_WORDS)
+def record_turn(name: str, **kwargs):
+    """
+    Record one spoken turn into memory.
+    With SAVE_RECORDINGS the turn is also archived as audio/<name>.wav.
+    """
+    path = None
+    if SAVE_RECORDINGS:
+        path = app_path("audio", f"{name}.wav")
+        ensure_audio_path(path)
 
+    return record_until_silence(path, **kwargs)
+
+
+def listen(name: str, purpose: str = "command", audio=None, **kwargs) -> str:
+    """
+    Record one spoken turn and transcribe it.
+    ``purpose`` selects the STT model size (see STT_MODEL_POLICY).
+    ``audio`` already captured on a barge-in is used instead of recording.
+    """
+    if audio is None:
+        audio = record_turn(name, **kwargs)
+    return transcribe(audio, purpose=purpose)
+
+
+def listen_for(name: str, grammar: dict, audio=None):
+    """
+    Record a short answer and recognise it against a fixed grammar
+    (yes/no, numbers, ...). Returns the grammar value or None.
+    ``audio`` already captured on a barge-in is used instead of recording.
+    """
+    if audio is None:
+        audio = record_turn(name)
+    return recognize(audio, grammar)
+
+
+def sync_mailbox(service, mailbox) -> bool:
+    """
+    Refresh the local mailbox mirror. A failed sync (network blip) is
+    reported and the local copy is used as is. Returns False while the
+    mirror holds no full copy yet (the copy runs in the background),
+    so callers go to Gmail directly.
+    """
+    try:
+        mailbox.sync(service)
+    except Exception as e:
+        print("Mailbox sync failed, using local copy:", e)
+    return mailbox.has_data()
+
+
+def find_from_sender(service, mailbox, sender, limit=3):
+    """
+    Recent emails from a sender. The mirror only holds the newest
+    messages, so when it has none from them Gmail is searched.
+    """
+    emails = mailbox.from_sender(sender, limit=limit) if sync_mailbox(service, mailbox) else []
+    return emails or get_emails_from_sender(service, sender, max_results=limit)
+
+
+def ask_choice(name: str, lines: list[str]):
+    """
+    Read out a list followed by a question and recognise the number
+    picked. Users who already know their answer can say it at any
+    point; playback stops and their words are used directly.
+    """
+    audio = speak_interruptible(lines)
+    if audio is None:
+        audio = record_turn(name)
+    return recognize(audio, NUMBER_GRAMMAR)
+
+
+def read_email_text(service, email, prefetcher=None):
+    """
+    Read out the picked email's body, using the prefetched copy when
+    there is one and fetching it on demand otherwise. Falls back to
+    the snippet from the listing. Returns the audio of a barge-in
+    (the user's answer to the next question), or None.
+    """
+    snippet = email["raw"].get("snippet")
+    if not (prefetcher and prefetcher.get(email)):
+        try:
+            load_email_body(service, email)
+        except Exception as e:
+            print("Body fetch failed:", e)
+
+    text = readable_text(email)
+    if text:
+        # the first sentence may already be synthesized by the prefetcher
+        first, rest = split_first_sentence(text)
+        return speak_interruptible([part for part in (first, rest) if part])
+    if snippet:
+        speak(snippet)
+    return None
 
-def is_exit(text: str) -> bool:
-    text = text.lower()
-    return any(word in text for word in EXIT_WORDS)
 
+def offer_attachment_download(email, attachments):
+    """
+    Offer to save an email's attachments; downloads stream into the
+    local attachment store (files already saved are not fetched again).
+    Attachments with neither an id nor inline data are not offered.
+    """
+    attachments = [a for a in attachments if is_downloadable(a)]
+    if not attachments:
+        return
 
-def is_shutdown(text: str) -> bool:
+    speak("Do you want me to save the attachments?")
+    if not listen_for("attachments_confirm", YES_NO_GRAMMAR):
+        return
+
+    store = get_attachment_store()
+    client = get_async_gmail()
+    saved = 0
+    for attachment in attachments:
+        try:
+            path = run_async(store.download(client, email["id"], attachment)).result()
+        except AttachmentTooLarge:
+            speak(f"{attachment['filename']} is too large to download")
+            continue
+        except Exception as e:
+            print("Attachment download failed:", e)
+            speak(f"I could not download {attachment['filename']}")
+            continue
+        print("Saved attachment:", path)
+        saved += 1
+
+    if saved:
+        speak(f"Saved {saved} attachment{'s' if saved > 1 else ''}")
+
+
+def start_prefetch(emails):
+    """
+    Start fetching likely picks while the list is read out.
+    """
+    prefetcher = Prefetcher(
+        max_candidates=PREFETCH_CANDIDATES,
+        prepare_speech=prepare_async,
+    )
+    try:
+        prefetcher.start(emails)
+    except Exception as e:
+        print("Prefetch not started:", e)
+    return prefetcher
+
+
+def has_word(text: str, words) -> bool:
+    """
+    True if any of ``words`` occurs in ``text`` as a whole word or
+    phrase ("bye" matches "bye zara", not "goodbye" or "byelaw").
+    """
     text = text.lower()
-    return any(word in text for word in SHUTDOWN_WORDS)
+    return any(re.search(rf"\b{re.escape(word)}\b", text) for word in words)
 
 
-def is_positive(text: str) -> bool:
-    text = text.lower()
-    return any(
-        word in text
-        for word in ["yes", "yeah", "sure", "ok", "okay", "read", "delete", "reply", "forward", "send"]
-    )
+def is_wake_word(text: str) -> bool:
+    return has_word(text, WAKE_WORDS)
 
 
-import re
+def is_exit(text: str) -> bool:
+    return has_word(text, EXIT_WORDS)
 
-def pick_index(text: str) -> int | None:
-    if not text:
-        return None
 
-    text = text.lower()
+def shutdown():
+    print(get_transport().metrics.summary())
+    speak("Goodbye. Shutting down.")
+    sys.exit(0)
 
-    word_map = {
-        "one": 1,
-        "two": 2,
-        "three": 3,
-        "four": 4,
-        "five": 5,
-        "six": 6,
-        "seven": 7,
-        "eight": 8,
-        "nine": 9,
-        "ten": 10,
-    }
-
-    # 1️⃣ Try number extraction first (most reliable)
-    numbers = re.findall(r"\d+", text)
-    if numbers:
-        return int(numbers[0]) - 1
-
-    # 2️⃣ Try word-based numbers (even with punctuation)
-    for word, num in word_map.items():
-        if word in text:
-            return num - 1
 
-    return None
+def is_shutdown(text: str) -> bool:
+    return has_word(text, SHUTDOWN_WORDS)
 
 
-def ask_and_handle_reply(service, email_obj):
-    speak("Do you want to reply or forward this email?")
-    path=app_path("audio","action_confirm.wav")
-    ensure_audio_path(path)
-    record_audio(path)
-    action = transcribe(path).lower()
+def ask_and_handle_reply(service, email_obj, audio=None):
+    """
+    Offer to reply to or forward an email. ``audio`` the user spoke
+    over the read-out already answers the question.
+    """
+    if audio is None:
+        speak("Do you want to reply or forward this email?")
+    action = listen_for("action_confirm", REPLY_ACTION_GRAMMAR, audio)
 
     # ✉️ REPLY
-    if "reply" in action:
+    if action == "reply":
         speak("Please tell your reply. I am listening.")
-        path = app_path("audio", "reply_body.wav")
-        ensure_audio_path(path)
-
-        # 🎙 listen for 10 seconds
-        record_audio_seconds(path, 10)
-        raw_reply = transcribe(path)
-
-        # ✨ enhance (grammar + clarity ONLY)
-        enhanced_reply = enhance_email_body(raw_reply)
-
-        # 🔊 read back for confirmation
+        raw_reply = listen(
+            "reply_body",
+            purpose="dictation",
+            max_seconds=DICTATION_MAX_SECONDS,
+            silence_seconds=DICTATION_SILENCE_SECONDS,
+        )
+
+        # ✨ enhance (grammar + clarity ONLY) and 🔊 read back as it streams
         speak("Here is your reply")
-        speak(enhanced_reply)
+        enhanced_reply = read_back_enhanced(raw_reply)
 
         speak("Do you want me to send this reply?")
-        path = app_path("audio", "reply_confirm.wav")
-        ensure_audio_path(path)
-        record_audio(path)
-        confirm = transcribe(path)
+        confirmed = listen_for("reply_confirm", YES_NO_GRAMMAR)
 
-        if not is_positive(confirm):
+        if not confirmed:
             speak("Reply cancelled")
             return
 
-        reply_to_email(service, email_obj, enhanced_reply)
+        pending = run_async(get_async_gmail().reply_to_email(email_obj, enhanced_reply))
+        speak("Sending your reply")
+        pending.result()
         speak("Reply sent successfully")
 
     # 📤 FORWARD
-    elif "forward" in action:
+    elif action == "forward":
         speak("Please say the name of the contact to forward to")
-        path=app_path("audio","forward_to.wav")
-        ensure_audio_path(path)
-        record_audio(path)
-        name = transcribe(path)
+        name = listen("forward_to")
 
         to_email = resolve_contact(name)
 
@@ -148,29 +287,41 @@ def ask_and_handle_reply(service, email_obj):
             return
 
         speak(f"Do you want me to forward this email to {name}?")
-        path=app_path("audio","forward_confirm.wav")
-        ensure_audio_path(path)
-        record_audio(path)
-        confirm = transcribe(path)
+        confirmed = listen_for("forward_confirm", YES_NO_GRAMMAR)
 
-        if not is_positive(confirm):
+        if not confirmed:
             speak("Forward cancelled")
             return
 
-        from gmail.gmail_client import forward_email
-        forward_email(service, email_obj, to_email)
+        pending = run_async(get_async_gmail().forward_email(email_obj, to_email))
+        speak("Forwarding the email")
+        pending.result()
         speak("Email forwarded successfully")
 
-from audio.recorder import record_audio_seconds
-from llm.email_enhancer import enhance_email_body
+from llm.email_enhancer import EnhancementFailed, stream_enhanced_email_body
+
+def read_back_enhanced(raw_text: str) -> str:
+    """
+    Queue the enhanced text for speaking sentence by sentence as the LLM
+    produces it, and return exactly what was read out.
+    """
+    sentences = []
+    try:
+        for sentence in stream_enhanced_email_body(raw_text):
+            speak_async(sentence)
+            sentences.append(sentence)
+    except EnhancementFailed as e:
+        print("Enhancement failed midway:", e)
+        speak("I could not finish improving it, so I will use your own words")
+        speak_async(raw_text)
+        return raw_text
+    return " ".join(sentences)
+
 
 def guided_send_email(service):
     # 1️⃣ Recipient
     speak("Whom should I send the email to?")
-    path = app_path("audio", "send_to.wav")
-    ensure_audio_path(path)
-    record_audio(path)
-    name = transcribe(path)
+    name = listen("send_to")
 
     to_email = resolve_contact(name)
     if not to_email:
@@ -179,61 +330,53 @@ def guided_send_email(service):
 
     # 2️⃣ Subject
     speak("What is the subject?")
-    path = app_path("audio", "send_subject.wav")
-    ensure_audio_path(path)
-    record_audio(path)
-    subject = transcribe(path)
+    subject = listen("send_subject")
 
-    # 3️⃣ Body (10 seconds)
+    # 3️⃣ Body (until the dictation pauses)
     speak("Please tell the email body. I am listening.")
-    path = app_path("audio", "send_body.wav")
-    ensure_audio_path(path)
-    record_audio_seconds(path, 10)
-    raw_body = transcribe(path)
-
-    # 4️⃣ Enhance body
-    enhanced_body = enhance_email_body(raw_body)
+    raw_body = listen(
+        "send_body",
+        purpose="dictation",
+        max_seconds=DICTATION_MAX_SECONDS,
+        silence_seconds=DICTATION_SILENCE_SECONDS,
+    )
 
-    # 5️⃣ Read back
+    # 4️⃣ + 5️⃣ Enhance body, reading it back while it is generated
     speak(f"Sending email to {name}")
     speak(f"Subject: {subject}")
     speak("Here is the email content")
-    speak(enhanced_body)
+    enhanced_body = read_back_enhanced(raw_body)
 
     # 6️⃣ Confirmation
     speak("Do you want me to send this email?")
-    path = app_path("audio", "send_confirm.wav")
-    ensure_audio_path(path)
-    record_audio(path)
-    confirm = transcribe(path)
+    confirmed = listen_for("send_confirm", YES_NO_GRAMMAR)
 
-    if not is_positive(confirm):
+    if not confirmed:
         speak("Email cancelled")
         return
 
-    # 7️⃣ Send
-    send_email(
-        service,
-        to_email=to_email,
-        subject=subject,
-        body=enhanced_body,
+    # 7️⃣ Send in the background while the assistant talks
+    pending = run_async(
+        get_async_gmail().send_email(
+            to_email=to_email,
+            subject=subject,
+            body=enhanced_body,
+        )
     )
+    speak("Sending your email")
+    pending.result()
 
     speak("Email sent successfully")
 
 
-def handle_command(service) -> bool:
-    path=app_path("audio","input.wav")  
-    ensure_audio_path(path)
-    record_audio(path)
-    text = transcribe(path)
+def handle_command(service, mailbox, search_index, audio=None) -> bool:
+    text = listen("input", audio=audio)
 
     print("You said:", text)
 
     # 🛑 Hard shutdown
     if is_shutdown(text):
-        speak("Goodbye. Shutting down.")
-        sys.exit(0)
+        shutdown()
 
     # 💤 Session exit
     if is_exit(text):
@@ -259,7 +402,7 @@ def handle_command(service) -> bool:
 
     # 📖 READ LATEST EMAIL
     elif intent["intent"] == "READ_LATEST_EMAIL":
-        email = get_latest_email(service)
+        email = mailbox.latest() if sync_mailbox(service, mailbox) else get_latest_email(service)
         if not email:
             speak("Your inbox is empty")
             return True
@@ -267,6 +410,12 @@ def handle_command(service) -> bool:
         speak(f"Email from {email['from']}")
         speak(f"Subject {email['subject']}")
 
+        # list views only carry headers; fetch the text parts now
+        try:
+            load_email_body(service, email)
+        except Exception as e:
+            print("Body fetch failed:", e)
+
         analysis = analyze_email(email)
 
         if analysis["has_html"]:
@@ -274,46 +423,51 @@ def handle_command(service) -> bool:
         if analysis["has_images"]:
             speak("This email contains images")
         if analysis["attachments"]:
-            speak(f"This email has {len(analysis['attachments'])} attachments")
+            names = ", ".join(a["filename"] for a in analysis["attachments"])
+            count = len(analysis["attachments"])
+            speak(f"This email has {count} attachment{'s' if count > 1 else ''}: {names}")
+            offer_attachment_download(email, analysis["attachments"])
 
         speak("Do you want me to read the email body?")
-        path=app_path("audio","confirm.wav")
-        ensure_audio_path(path)
-        record_audio(path)
-        reply = transcribe(path)
+        confirmed = listen_for("confirm", YES_NO_GRAMMAR)
 
-        if is_positive(reply):
+        if confirmed:
+            # long read-outs can be cut short by talking over them;
+            # what the user said answers the reply/forward question
+            audio = None
             if email.get("body"):
-                speak(email["body"])
+                audio = speak_interruptible([email["body"]])
             elif email.get("html"):
                 speak("Reading extracted text from HTML email")
-                speak(html_to_text(email["html"]))
+                audio = speak_interruptible([analysis["text"]])
             else:
                 speak("This email does not contain readable text")
 
-            ask_and_handle_reply(service, email)
+            ask_and_handle_reply(service, email, audio)
 
     # 📥 LIST & READ UNREAD EMAILS
     elif intent["intent"] == "READ_UNREAD_EMAILS":
-        emails = get_unread_emails(service, max_results=10)
+        if sync_mailbox(service, mailbox):
+            emails = mailbox.unread(limit=10)
+        else:
+            emails = get_unread_emails(service, max_results=10)
 
         if not emails:
             speak("You have no unread emails")
             return True
 
-        speak(f"here are the last {len(emails)} unread emails")
-
-        for i, mail in enumerate(emails, start=1):
-            speak(f"Email {i} from {mail['from']} with subject {mail['subject']}")
-
-        speak("Which email should I read? Say a number between one and ten.")
-        path=app_path("audio","choice.wav")
-        ensure_audio_path(path)
-        record_audio(path)
-        choice_text = transcribe(path)
-
-        idx = pick_index(choice_text)
+        prefetcher = start_prefetch(emails)
+        idx = ask_choice(
+            "choice",
+            [f"here are the last {len(emails)} unread emails"]
+            + [
+                f"Email {i} from {mail['from']} with subject {mail['subject']}"
+                for i, mail in enumerate(emails, start=1)
+            ]
+            + ["Which email should I read? Say a number between one and ten."],
+        )
         if idx is None or idx >= len(emails):
+            prefetcher.cancel()
             speak("Invalid choice")
             return True
 
@@ -321,23 +475,19 @@ def handle_command(service) -> bool:
 
         speak(f"Reading email from {selected['from']}")
         speak(f"Subject {selected['subject']}")
-
-        snippet = selected["raw"].get("snippet")
-        if snippet:
-            speak(snippet)
+        audio = read_email_text(service, selected, prefetcher)
+        prefetcher.cancel()
 
         # Ask for reply
-        ask_and_handle_reply(service, selected)
+        ask_and_handle_reply(service, selected, audio)
 
         # Ask for delete
         speak("Do you want to move this email to trash?")
-        path=app_path("audio","confirm.wav")
-        ensure_audio_path(path)
-        record_audio(path)
-        confirm = transcribe(path)
+        confirmed = listen_for("confirm", YES_NO_GRAMMAR)
 
-        if is_positive(confirm):
+        if confirmed:
             delete_email(service, selected["id"])
+            mailbox.mark_trashed([selected["id"]])
             speak("Email moved to trash")
 
     # 📬 READ EMAILS FROM SENDER
@@ -345,60 +495,49 @@ def handle_command(service) -> bool:
         sender_name = intent.get("to")
         sender_email = resolve_contact(sender_name) or sender_name
 
-        emails = get_emails_from_sender(service, sender_email)
+        emails = find_from_sender(service, mailbox, sender_email)
 
         if not emails:
             speak(f"No recent emails from {sender_name}")
             return True
 
-        speak(f"Here are the last {len(emails)} emails from {sender_name}")
-
-        for i, mail in enumerate(emails, start=1):
-            speak(f"Email {i}: {mail['subject']}")
-
-        speak("Which email should I read? Say one, two, or three.")
-        path=app_path("audio","choice.wav")
-        ensure_audio_path(path)
-        record_audio(path)
-        choice_text = transcribe(path)
-
-        idx = pick_index(choice_text)
+        prefetcher = start_prefetch(emails)
+        idx = ask_choice(
+            "choice",
+            [f"Here are the last {len(emails)} emails from {sender_name}"]
+            + [f"Email {i}: {mail['subject']}" for i, mail in enumerate(emails, start=1)]
+            + ["Which email should I read? Say one, two, or three."],
+        )
         if idx is None or idx >= len(emails):
+            prefetcher.cancel()
             speak("Invalid choice")
             return True
 
         selected = emails[idx]
 
         speak(f"Reading email subject {selected['subject']}")
-        snippet = selected["raw"].get("snippet")
-        if snippet:
-            speak(snippet)
+        audio = read_email_text(service, selected, prefetcher)
+        prefetcher.cancel()
 
-        ask_and_handle_reply(service, selected)
+        ask_and_handle_reply(service, selected, audio)
 
     # 🗑 DELETE EMAIL FROM SENDER
     elif intent["intent"] == "DELETE_EMAIL_FROM_SENDER":
         sender_name = intent.get("to")
         sender_email = resolve_contact(sender_name) or sender_name
 
-        emails = get_emails_from_sender(service, sender_email)
+        emails = find_from_sender(service, mailbox, sender_email)
 
         if not emails:
             speak(f"No recent emails from {sender_name}")
             return True
 
-        speak(f"here are the last {len(emails)} emails from {sender_name}")
-
-        for i, mail in enumerate(emails, start=1):
-            speak(f"Email {i}: {mail['subject']}")
-
-        speak("Which email should I delete? Say one, two, or three.")
-        path=app_path("audio","choice.wav")
-        ensure_audio_path(path)
-        record_audio(path)
-        choice_text = transcribe(path)
-
-        idx = pick_index(choice_text)
+        idx = ask_choice(
+            "choice",
+            [f"here are the last {len(emails)} emails from {sender_name}"]
+            + [f"Email {i}: {mail['subject']}" for i, mail in enumerate(emails, start=1)]
+            + ["Which email should I delete? Say one, two, or three."],
+        )
         if idx is None or idx >= len(emails):
             speak("Invalid choice")
             return True
@@ -406,52 +545,115 @@ def handle_command(service) -> bool:
         selected = emails[idx]
 
         speak(f"Are you sure you want to delete the email with subject {selected['subject']}?")
-        path=app_path("audio","confirm.wav")
-        ensure_audio_path(path)
-        record_audio(path)
-        confirm = transcribe(path)
+        confirmed = listen_for("confirm", YES_NO_GRAMMAR)
 
-        if is_positive(confirm):
+        if confirmed:
             delete_email(service, selected["id"])
+            mailbox.mark_trashed([selected["id"]])
             speak("Email moved to trash")
         else:
             speak("Deletion cancelled")
 
+    # 🔎 SEARCH EMAILS
+    elif intent["intent"] == "SEARCH_EMAILS":
+        topic = intent.get("query") or intent.get("subject")
+        if not topic:
+            speak("What should I search for?")
+            topic = listen("search_query")
+
+        sync_mailbox(service, mailbox)
+        emails = search_index.search(topic, limit=5)
+
+        if not emails:
+            speak(f"I found no emails about {topic}")
+            return True
+
+        prefetcher = start_prefetch(emails)
+        idx = ask_choice(
+            "choice",
+            [f"I found {len(emails)} emails about {topic}"]
+            + [
+                f"Email {i} from {mail['from']} with subject {mail['subject']}"
+                for i, mail in enumerate(emails, start=1)
+            ]
+            + ["Which email should I read? Say a number."],
+        )
+        if idx is None or idx >= len(emails):
+            prefetcher.cancel()
+            speak("Invalid choice")
+            return True
+
+        selected = emails[idx]
+
+        speak(f"Reading email from {selected['from']}")
+        speak(f"Subject {selected['subject']}")
+        audio = read_email_text(service, selected, prefetcher)
+        prefetcher.cancel()
+
+        ask_and_handle_reply(service, selected, audio)
+
     # 📝 SUMMARIZE EMAIL
     elif intent["intent"] == "SUMMARIZE_LATEST_EMAIL":
-        email = get_latest_email(service)
+        email = mailbox.latest() if sync_mailbox(service, mailbox) else get_latest_email(service)
         if not email:
             speak("No email to summarize")
+            return True
+
+        try:
+            load_email_body(service, email)
+        except Exception as e:
+            print("Body fetch failed:", e)
+
+        text = readable_text(email) or email.get("snippet", "")
+        summary = summarize_email(email["id"], text)
+
+        speak(f"Email from {email['from']} about {email['subject']}")
+        if summary:
+            # talking over the summary is the next command
+            audio = speak_interruptible([summary])
+            if audio is not None:
+                return handle_command(service, mailbox, search_index, audio)
         else:
-            speak(f"Latest email subject is {email['subject']}")
+            speak("This email does not contain readable text")
 
     # 🧹 DELETE ALL READ EMAILS
-    elif intent["intent"] == "DELETE_LATEST_EMAIL" and "read" in text.lower():
-        speak("This will move all read emails to trash. Are you sure?")
-        path=app_path("audio","confirm.wav")
-        ensure_audio_path(path)
-        record_audio(path)
-        confirm = transcribe(path)
+    elif intent["intent"] == "DELETE_LATEST_EMAIL" and has_word(text, ["read"]):
+        speak("This will move all read emails in your inbox to trash. Are you sure?")
+        confirmed = listen_for("confirm", YES_NO_GRAMMAR)
 
-        if not is_positive(confirm):
+        if not confirmed:
             speak("Cancelled")
             return True
 
-        from gmail.gmail_client import get_read_emails
-        read_emails = get_read_emails(service)
+        from gmail.gmail_client import list_message_ids, trash_messages, READ_EMAILS_QUERY
+        read_ids = list_message_ids(service, READ_EMAILS_QUERY)
 
-        if not read_emails:
+        if not read_ids:
             speak("There are no read emails to delete")
             return True
 
-        for msg in read_emails:
-            delete_email(service, msg["id"])
+        # the count is only known now, so confirm it before anything moves
+        speak(f"That is {len(read_ids)} read emails. Move them to trash?")
+        if not listen_for("confirm", YES_NO_GRAMMAR):
+            speak("Cancelled")
+            return True
+
+        speak(f"Moving {len(read_ids)} read emails to trash")
+        trashed = trash_messages(
+            service,
+            read_ids,
+            on_progress=lambda done, total: print(f"Trashed {done}/{total}"),
+        )
+        mailbox.mark_trashed(trashed)
 
-        speak(f"Moved {len(read_emails)} read emails to trash")
+        if len(trashed) < len(read_ids):
+            speak(f"Moved {len(trashed)} of {len(read_ids)} read emails to trash")
+        else:
+            speak(f"Moved {len(trashed)} read emails to trash")
 
     # 🗑 DELETE LATEST EMAIL
     elif intent["intent"] == "DELETE_LATEST_EMAIL":
-        email = get_latest_email(service)
+        email = mailbox.latest() if sync_mailbox(service, mailbox) else get_latest_email(service)
         if not email:
             speak("No email to delete")
             return True
@@ -460,13 +662,11 @@ def handle_command(service) -> bool:
         speak(f"Subject {email['subject']}")
         speak("Are you sure you want to delete this email?")
 
-        path=app_path("audio","confirm.wav")
-        ensure_audio_path(path)
-        record_audio(path)
-        reply = transcribe(path)
+        confirmed = listen_for("confirm", YES_NO_GRAMMAR)
 
-        if is_positive(reply):
+        if confirmed:
             delete_email(service, email["id"])
+            mailbox.mark_trashed([email["id"]])
             speak("Email moved to trash")
         else:
             speak("Deletion cancelled")
@@ -483,20 +683,61 @@ def handle_command(service) -> bool:
 
 
 def main():
+    speak("Starting up.")
+    service = warm_up()
+    mailbox = MailboxMirror(
+        MAILBOX_DB_PATH,
+        initial_sync=MAILBOX_INITIAL_SYNC,
+        min_sync_interval=MAILBOX_SYNC_INTERVAL_SECONDS,
+        service_factory=new_service,
+    )
+    # 📥 First copy in the background; commands use Gmail until it is done
+    if not mailbox.has_data():
+        mailbox.start_full_sync()
+    search_index = SearchIndex(SEARCH_DB_PATH, service_factory=new_service)
+    mailbox.add_listener(search_index.on_mailbox_change)
+
+    # 📬 Announce new mail in the background, only between sessions
+    watcher = None
+    if WATCH_NEW_MAIL:
+        watcher = MailWatcher(
+            HistoryPoller(
+                new_service,
+                min_interval=WATCH_MIN_INTERVAL_SECONDS,
+                max_interval=WATCH_MAX_INTERVAL_SECONDS,
+            ),
+            announce=lambda text: speak(text, priority=PRIORITY_LOW),
+            on_new_mail=lambda ids: mailbox.invalidate(),
+        )
+        watcher.start()
+
+    # 🎯 Scores wake candidates against the wake phrases, no transcription
+    spotter = create_spotter(
+        WAKE_WORDS + [f"hey {wake}" for wake in WAKE_WORDS] + SHUTDOWN_WORDS
+    )
+
     speak("Assistant is loaded. Say the wake word to start.")
-    service = authenticate_gmail()
 
     while True:
-        path=app_path("audio","wake.wav")
-        ensure_audio_path(path)
-        record_audio(path)
-        heard = transcribe(path)
+        if watcher:
+            watcher.set_idle(True)
+
+        # 👂 Streams the mic; Whisper only runs on short voiced bursts.
+        # Announcements play while listening, so our own voice is muted.
+        heard = listen_for_wake_word(
+            lambda samples: transcribe(samples, purpose="wake"),
+            lambda text: is_wake_word(text) or is_shutdown(text),
+            is_muted=is_speaking,
+            spotter=spotter,
+        )
+
+        if watcher:
+            watcher.set_idle(False)
 
         print("Wake heard:", heard)
 
         if is_shutdown(heard):
-            speak("Goodbye. Shutting down.")
-            sys.exit(0)
+            shutdown()
 
         if is_wake_word(heard):
             speak("Yes, I am listening")
@@ -504,7 +745,17 @@ def main():
             misunderstand_count = 0
 
             while True:
-                result = handle_command(service)
+                # 🛟 A Gmail outage ends the request, not the assistant
+                try:
+                    result = handle_command(service, mailbox, search_index)
+                except GmailUnavailable:
+                    speak("Gmail is not reachable right now. Please try again in a minute.")
+                    result = True
+                except Exception as e:
+                    print("Command failed:", e)
+                    print(get_transport().metrics.summary())
+                    speak("Sorry, something went wrong with that request.")
+                    result = True
 
                 if not result:
                     break
@@ -514,8 +765,6 @@ def main():
                     speak("I am going back to sleep.")
                     break
 
-        time.sleep(0.4)
-
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,199 @@
+import difflib
+import re
+
+import numpy as np
+
+
+def to_float32(samples):
+    """
+    Convert 16 kHz PCM samples to the float32 [-1, 1] range Whisper expects.
+    """
+    if samples.dtype == np.float32:
+        return samples
+    audio = samples.astype(np.float32)
+    audio *= 1.0 / 32768.0
+    return audio
+
+
+class STTBackend:
+    """
+    Speech-to-text engine interface.
+
+    Backends keep one loaded model per size and transcribe float32
+    16 kHz mono buffers (or file paths) to text.
+    """
+
+    name = "base"
+    scores_phrases = False  # choose() scores phrases without transcribing
+
+    def __init__(self):
+        self._models = {}
+
+    def load(self, model_size: str):
+        if model_size not in self._models:
+            print(f"Loading {self.name} {model_size} model...")
+            self._models[model_size] = self._load(model_size)
+        return self._models[model_size]
+
+    def _load(self, model_size: str):
+        raise NotImplementedError
+
+    def transcribe(self, audio, model_size: str, language: str = "en") -> str:
+        raise NotImplementedError
+
+    def choose(self, audio, phrases, model_size: str, language: str = "en", min_logprob=None):
+        """
+        Return the index of the phrase in ``phrases`` that was spoken,
+        or None if none of them fits.
+
+        Generic version: transcribe, then fuzzy-match the transcript
+        (``min_logprob`` is ignored). Backends that can score candidates
+        directly override this and set ``scores_phrases``.
+        """
+        text = _normalize(self.transcribe(audio, model_size, language))
+        if not text:
+            return None
+
+        best, best_ratio = None, 0.0
+        for i, phrase in enumerate(phrases):
+            phrase = _normalize(phrase)
+            if re.search(rf"\b{re.escape(phrase)}\b", text):
+                ratio = 1.0 + len(phrase) / 100  # prefer the longest exact hit
+            else:
+                ratio = difflib.SequenceMatcher(None, phrase, text).ratio()
+            if ratio > best_ratio:
+                best, best_ratio = i, ratio
+
+        return best if best_ratio >= 0.6 else None
+
+
+class WhisperBackend(STTBackend):
+    """
+    Reference openai-whisper engine (PyTorch).
+    """
+
+    name = "whisper"
+    scores_phrases = True
+
+    def _load(self, model_size):
+        import whisper
+        return whisper.load_model(model_size)
+
+    def transcribe(self, audio, model_size, language="en"):
+        model = self.load(model_size)
+        result = model.transcribe(audio, language=language, fp16=False)
+        return result["text"].strip()
+
+    def choose(self, audio, phrases, model_size, language="en", min_logprob=None):
+        """
+        Score every candidate phrase against the audio in one pass.
+
+        The encoder runs once; the decoder is teacher-forced on all
+        candidates as a single batch, so there is no token-by-token
+        search. The best mean token log-probability wins if it clears
+        ``min_logprob`` (default SHORT_ANSWER_MIN_LOGPROB).
+        """
+        import torch
+        import whisper
+        from whisper.tokenizer import get_tokenizer
+        from config.settings import SHORT_ANSWER_MIN_LOGPROB
+
+        model = self.load(model_size)
+        tokenizer = get_tokenizer(
+            model.is_multilingual,
+            num_languages=model.num_languages,
+            language=language,
+            task="transcribe",
+        )
+
+        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), model.dims.n_mels)
+        prefix = list(tokenizer.sot_sequence_including_notimestamps)
+        # Whisper writes short answers as " Yes." / " Three."
+        targets = [
+            tokenizer.encode(" " + phrase.strip().capitalize() + ".") + [tokenizer.eot]
+            for phrase in phrases
+        ]
+
+        width = len(prefix) + max(len(t) for t in targets)
+        tokens = torch.full((len(targets), width), tokenizer.eot, dtype=torch.long)
+        for i, target in enumerate(targets):
+            tokens[i, :len(prefix) + len(target)] = torch.tensor(prefix + target)
+
+        with torch.no_grad():
+            features = model.embed_audio(mel.unsqueeze(0).to(model.device))
+            logits = model.logits(
+                tokens[:, :-1].to(model.device),
+                features.expand(len(targets), -1, -1),
+            )
+            logprobs = torch.log_softmax(logits.float(), dim=-1)
+
+        scores = []
+        for i, target in enumerate(targets):
+            positions = torch.arange(len(prefix) - 1, len(prefix) - 1 + len(target))
+            picked = logprobs[i, positions, torch.tensor(target)]
+            scores.append(picked.mean().item())
+
+        if min_logprob is None:
+            min_logprob = SHORT_ANSWER_MIN_LOGPROB
+        best = max(range(len(scores)), key=scores.__getitem__)
+        return best if scores[best] >= min_logprob else None
+
+
+class FasterWhisperBackend(STTBackend):
+    """
+    CTranslate2 engine via faster-whisper, quantized for CPU inference.
+    """
+
+    name = "faster-whisper"
+
+    def __init__(self, compute_type="int8", cpu_threads=0):
+        super().__init__()
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+
+    def _load(self, model_size):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise RuntimeError(
+                "STT_BACKEND is 'faster-whisper' but the faster-whisper "
+                "package is not installed (pip install faster-whisper)"
+            ) from e
+
+        return WhisperModel(
+            model_size,
+            device="cpu",
+            compute_type=self.compute_type,
+            cpu_threads=self.cpu_threads,
+        )
+
+    def transcribe(self, audio, model_size, language="en"):
+        model = self.load(model_size)
+        segments, _ = model.transcribe(
+            audio,
+            language=language,
+            beam_size=1,
+            vad_filter=False,
+        )
+        # segments is a lazy generator, decoding happens here
+        return "".join(segment.text for segment in segments).strip()
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).strip()
+
+
+BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+
+def create_backend(name: str, compute_type="int8", cpu_threads=0) -> STTBackend:
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown STT backend {name!r}, expected one of {sorted(BACKENDS)}"
+        )
+    if name == FasterWhisperBackend.name:
+        return FasterWhisperBackend(compute_type, cpu_threads)
+    return BACKENDS[name]()
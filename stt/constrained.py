@@ -0,0 +1,60 @@
+from audio.vad import has_speech
+from stt.backends import to_float32
+from stt.whisper_engine import get_backend, model_for
+
+# Spoken phrase -> value. Only these answers can be recognised.
+YES_NO_GRAMMAR = {
+    "yes": True,
+    "yeah": True,
+    "yes please": True,
+    "sure": True,
+    "okay": True,
+    "go ahead": True,
+    "read it": True,
+    "send it": True,
+    "delete it": True,
+    "no": False,
+    "nope": False,
+    "no thanks": False,
+    "cancel": False,
+    "don't": False,
+}
+
+_NUMBER_WORDS = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten"]
+
+# 0-based index of the picked item
+NUMBER_GRAMMAR = {}
+for _i, _word in enumerate(_NUMBER_WORDS):
+    NUMBER_GRAMMAR[_word] = _i
+    NUMBER_GRAMMAR[str(_i + 1)] = _i
+    NUMBER_GRAMMAR[f"number {_word}"] = _i
+
+REPLY_ACTION_GRAMMAR = {
+    "reply": "reply",
+    "reply to it": "reply",
+    "forward": "forward",
+    "forward it": "forward",
+    "no": None,
+    "neither": None,
+    "nothing": None,
+}
+
+
+def recognize(samples, grammar: dict, purpose="short"):
+    """
+    Recognise a short answer restricted to the phrases of ``grammar``
+    and return the mapped value, or None when nothing matched.
+
+    Buffers without speech return immediately without touching the model.
+    """
+    if samples.size == 0 or not has_speech(samples):
+        return None
+
+    phrases = list(grammar)
+    audio = to_float32(samples.reshape(-1))
+    index = get_backend().choose(audio, phrases, model_for(purpose))
+
+    if index is None:
+        return None
+    print("Heard:", phrases[index])
+    return grammar[phrases[index]]
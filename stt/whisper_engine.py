@@ -1,16 +1,43 @@
-# placeholder
-import whisper
-
-_model = None
-
-def load_model():
-    global _model
-    if _model is None:
-        print("Loading Whisper BASE model...")
-        _model = whisper.load_model("base")
-    return _model
-
-def transcribe(audio_file):
-    model = load_model()
-    result = model.transcribe(audio_file, language="en")
-    return result["text"].strip()
+import numpy as np
+
+from config.settings import (
+    LANGUAGE,
+    STT_BACKEND,
+    STT_COMPUTE_TYPE,
+    STT_CPU_THREADS,
+    STT_MODEL_POLICY,
+)
+from stt.backends import create_backend, to_float32
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = create_backend(STT_BACKEND, STT_COMPUTE_TYPE, STT_CPU_THREADS)
+    return _backend
+
+
+def model_for(purpose: str) -> str:
+    return STT_MODEL_POLICY.get(purpose, STT_MODEL_POLICY["command"])
+
+
+def load_model(purpose="command"):
+    return get_backend().load(model_for(purpose))
+
+
+def transcribe(audio, purpose="command"):
+    """
+    Transcribe a file path or an in-memory sample buffer.
+
+    ``purpose`` picks the model size from STT_MODEL_POLICY, so wake
+    words and short answers use a small model and dictation a larger one.
+    Buffers skip the ffmpeg decode Whisper runs for files.
+    """
+    if isinstance(audio, np.ndarray):
+        if audio.size == 0:
+            return ""
+        audio = to_float32(audio.reshape(-1))
+
+    return get_backend().transcribe(audio, model_for(purpose), language=LANGUAGE)
@@ -0,0 +1,14 @@
+import pytest
+
+import gmail.transport
+from gmail.transport import GmailTransport
+
+
+@pytest.fixture(autouse=True)
+def fast_transport(monkeypatch):
+    """
+    A fresh shared transport without rate limiting or backoff delays.
+    """
+    transport = GmailTransport(units_per_second=1e9, backoff_base=0.0, backoff_max=0.0)
+    monkeypatch.setattr(gmail.transport, "_transport", transport)
+    return transport
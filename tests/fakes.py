@@ -0,0 +1,68 @@
+import json
+
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.http import HttpMockSequence
+
+BOUNDARY = "batch_boundary"
+
+
+class RecordingHttp(HttpMockSequence):
+    """
+    HttpMockSequence that also keeps every request it was sent.
+    """
+
+    def __init__(self, responses):
+        super().__init__(responses)
+        self.requests = []
+
+    def request(self, uri, method="GET", body=None, headers=None, *args, **kwargs):
+        self.requests.append((method, uri, body))
+        return super().request(uri, method, body, headers, *args, **kwargs)
+
+
+def gmail_service(responses):
+    """
+    A real Gmail service object (static discovery document) whose HTTP
+    layer replays ``responses``; the http object is returned as well.
+    """
+    http = RecordingHttp(responses)
+    return build_from_document(get_static_doc("gmail", "v1"), http=http), http
+
+
+def json_response(body, status=200):
+    return {"status": str(status), "content-type": "application/json"}, json.dumps(body)
+
+
+def batch_response(parts):
+    """
+    A multipart/mixed batch reply from (request_id, status, body) parts.
+    """
+    chunks = []
+    for request_id, status, body in parts:
+        chunks.append(
+            f"--{BOUNDARY}\r\n"
+            "Content-Type: application/http\r\n"
+            f"Content-ID: <response-base + {request_id}>\r\n\r\n"
+            f"HTTP/1.1 {status} OK\r\n"
+            "Content-Type: application/json\r\n\r\n"
+            f"{json.dumps(body)}\r\n"
+        )
+    chunks.append(f"--{BOUNDARY}--")
+    headers = {"status": "200", "content-type": f"multipart/mixed; boundary={BOUNDARY}"}
+    return headers, "".join(chunks)
+
+
+def message(msg_id, sender="alice@example.com", subject="Hello", labels=("INBOX", "UNREAD")):
+    return {
+        "id": msg_id,
+        "threadId": f"t-{msg_id}",
+        "labelIds": list(labels),
+        "snippet": f"snippet {msg_id}",
+        "payload": {
+            "headers": [
+                {"name": "From", "value": sender},
+                {"name": "Subject", "value": subject},
+            ],
+        },
+    }
@@ -0,0 +1,116 @@
+import asyncio
+import base64
+import email
+import json
+
+import httpx
+import pytest
+
+from fakes import message
+from gmail.async_client import AsyncGmailClient
+
+
+def run(handler, coro_fn, **kwargs):
+    """
+    Run ``coro_fn(client)`` against a fake Gmail server ``handler``.
+    """
+    async def main():
+        async with AsyncGmailClient(transport=httpx.MockTransport(handler), **kwargs) as client:
+            return await coro_fn(client)
+    return asyncio.run(main())
+
+
+def test_unread_listing_fetches_metadata():
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        if request.url.path.endswith("/messages"):
+            return httpx.Response(200, json={"messages": [{"id": "a"}, {"id": "b"}]})
+        msg_id = request.url.path.rsplit("/", 1)[1]
+        return httpx.Response(200, json=message(msg_id, subject=f"Subject {msg_id}"))
+
+    emails = run(handler, lambda client: client.get_unread_emails())
+
+    assert [e["subject"] for e in emails] == ["Subject a", "Subject b"]
+    assert seen[0].url.params.get_list("labelIds") == ["INBOX", "UNREAD"]
+    for request in seen[1:]:
+        assert request.url.params["format"] == "metadata"
+        assert "From" in request.url.params.get_list("metadataHeaders")
+
+
+def test_fetches_overlap_up_to_max_concurrency():
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json=message(request.url.path.rsplit("/", 1)[1]))
+
+    ids = [str(i) for i in range(8)]
+    messages = run(handler, lambda client: client.get_messages(ids), max_concurrency=3)
+
+    assert [m["id"] for m in messages] == ids
+    assert peak == 3
+
+
+def test_transient_error_is_retried(fast_transport):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json=message("a"))
+
+    result = run(handler, lambda client: client.get_message("a"))
+
+    assert result["id"] == "a"
+    assert len(calls) == 2
+    assert fast_transport.metrics.snapshot()["messages.get"]["retries"] == 1
+
+
+def test_send_posts_raw_message_once():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json={"id": "sent-1"})
+
+    sent_id = run(handler, lambda client: client.send_email("bob@example.com", "Hi", "Body text"))
+
+    assert sent_id == "sent-1"
+    assert calls[0].method == "POST" and calls[0].url.path.endswith("/messages/send")
+    raw = json.loads(calls[0].content)["raw"]
+    mime = email.message_from_bytes(base64.urlsafe_b64decode(raw))
+    assert mime["to"] == "bob@example.com"
+    assert mime.get_payload() == "Body text"
+
+
+def test_send_is_not_retried_after_server_error():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(500)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        run(handler, lambda client: client.send_email("bob@example.com", "Hi", "Body"))
+
+    assert len(calls) == 1
+
+
+def test_delete_moves_to_trash():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json={"id": "a"})
+
+    assert run(handler, lambda client: client.delete_email("a"))
+    assert calls[0].method == "POST"
+    assert calls[0].url.path.endswith("/messages/a/trash")
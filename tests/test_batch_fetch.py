@@ -0,0 +1,77 @@
+from fakes import batch_response, gmail_service, json_response, message
+from gmail.gmail_client import get_emails_from_sender, get_messages, get_unread_emails
+
+
+def test_get_messages_is_one_batch_round_trip():
+    service, http = gmail_service([
+        batch_response([("a", 200, message("a")), ("b", 200, message("b")), ("c", 200, message("c"))]),
+    ])
+
+    messages = get_messages(service, ["a", "b", "c"], format="metadata")
+
+    assert [m["id"] for m in messages] == ["a", "b", "c"]
+    assert len(http.requests) == 1
+    method, uri, body = http.requests[0]
+    assert method == "POST" and "batch" in uri
+    assert "format=metadata" in body
+    assert "metadataHeaders=From" in body
+
+
+def test_get_messages_keeps_order_and_skips_failures():
+    service, _ = gmail_service([
+        batch_response([
+            ("b", 200, message("b")),
+            ("a", 404, {"error": {"code": 404, "message": "Not Found"}}),
+            ("c", 200, message("c")),
+        ]),
+    ])
+
+    messages = get_messages(service, ["a", "b", "c"])
+
+    assert [m["id"] for m in messages] == ["b", "c"]
+
+
+def test_transient_sub_request_is_retried_in_a_smaller_batch(fast_transport):
+    service, http = gmail_service([
+        batch_response([
+            ("a", 200, message("a")),
+            ("b", 503, {"error": {"code": 503, "message": "Backend Error"}}),
+        ]),
+        batch_response([("b", 200, message("b"))]),
+    ])
+
+    messages = get_messages(service, ["a", "b"])
+
+    assert [m["id"] for m in messages] == ["a", "b"]
+    assert len(http.requests) == 2
+    assert "/messages/b" in http.requests[1][2]
+    assert "/messages/a" not in http.requests[1][2]
+    assert fast_transport.metrics.snapshot()["messages.get"]["retries"] == 1
+
+
+def test_unread_listing_is_list_plus_one_batch():
+    service, http = gmail_service([
+        json_response({"messages": [{"id": "a"}, {"id": "b"}]}),
+        batch_response([
+            ("a", 200, message("a", subject="First")),
+            ("b", 200, message("b", subject="Second")),
+        ]),
+    ])
+
+    emails = get_unread_emails(service)
+
+    assert [e["subject"] for e in emails] == ["First", "Second"]
+    assert len(http.requests) == 2
+    assert "labelIds=UNREAD" in http.requests[0][1]
+
+
+def test_sender_listing_queries_the_sender():
+    service, http = gmail_service([
+        json_response({"messages": [{"id": "a"}]}),
+        batch_response([("a", 200, message("a", sender="bob@example.com"))]),
+    ])
+
+    emails = get_emails_from_sender(service, "bob@example.com")
+
+    assert [e["from"] for e in emails] == ["bob@example.com"]
+    assert "q=from%3Abob%40example.com" in http.requests[0][1]
@@ -0,0 +1,117 @@
+import threading
+
+from fakes import batch_response, gmail_service, json_response, message
+from gmail.watcher import HistoryPoller, MailWatcher, NotificationSource
+
+
+def added(*ids):
+    return {"messagesAdded": [{"message": {"id": i}} for i in ids]}
+
+
+def test_first_poll_only_records_the_history_id():
+    service, http = gmail_service([json_response({"historyId": "100"})])
+    poller = HistoryPoller(lambda: service)
+
+    assert poller.poll(service) == []
+    assert poller.history_id == "100"
+    assert "/profile" in http.requests[0][1]
+
+
+def test_poll_follows_pages_from_the_last_history_id():
+    service, http = gmail_service([
+        json_response({"history": [added("a", "b")], "nextPageToken": "p2", "historyId": "105"}),
+        json_response({"history": [added("b", "c")], "historyId": "110"}),
+    ])
+    poller = HistoryPoller(lambda: service, min_interval=5.0)
+    poller.history_id = "100"
+
+    assert poller.poll(service) == ["a", "b", "c"]
+    assert poller.history_id == "110"
+    assert "startHistoryId=100" in http.requests[0][1]
+    assert "pageToken=p2" in http.requests[1][1]
+    assert poller.interval == 5.0
+
+
+def test_empty_polls_back_off_up_to_the_maximum():
+    service, _ = gmail_service([json_response({"historyId": "100"})] * 4)
+    poller = HistoryPoller(lambda: service, min_interval=10.0, max_interval=50.0)
+    poller.history_id = "100"
+
+    intervals = []
+    for _ in range(4):
+        assert poller.poll(service) == []
+        intervals.append(poller.interval)
+
+    assert intervals == [20.0, 40.0, 50.0, 50.0]
+
+
+def test_expired_history_starts_again_from_now():
+    service, http = gmail_service([
+        json_response({"error": {"code": 404, "message": "Requested entity was not found."}}, status=404),
+        json_response({"historyId": "500"}),
+    ])
+    poller = HistoryPoller(lambda: service)
+    poller.history_id = "1"
+
+    assert poller.poll(service) == []
+    assert poller.history_id is None
+    assert poller.poll(service) == []
+    assert poller.history_id == "500"
+    assert "/profile" in http.requests[1][1]
+
+
+def test_poller_reports_new_mail_from_its_own_thread():
+    service, _ = gmail_service([
+        json_response({"historyId": "100"}),
+        json_response({"history": [added("a")], "historyId": "101"}),
+    ])
+    poller = HistoryPoller(lambda: service, min_interval=0.01, max_interval=0.01)
+    reported = []
+    done = threading.Event()
+
+    def on_new(svc, ids):
+        reported.append((threading.current_thread().name, ids))
+        done.set()
+
+    poller.start(on_new)
+    try:
+        assert done.wait(5)
+    finally:
+        poller.stop()
+
+    assert reported == [("gmail-watch", ["a"])]
+
+
+class OneShotSource(NotificationSource):
+    def __init__(self, service, ids):
+        self.service = service
+        self.ids = ids
+
+    def start(self, on_new):
+        on_new(self.service, self.ids)
+
+
+def test_watcher_announces_unread_inbox_mail_important_first():
+    service, _ = gmail_service([
+        batch_response([
+            ("a", 200, message("a", sender="Alice <alice@example.com>", subject="Lunch")),
+            ("b", 200, message("b", sender="Bob <bob@example.com>", labels=("INBOX", "UNREAD", "IMPORTANT"))),
+            ("c", 200, message("c", labels=("INBOX",))),
+        ]),
+    ])
+    spoken = []
+    done = threading.Event()
+
+    def announce(text):
+        spoken.append(text)
+        if len(spoken) == 2:
+            done.set()
+
+    stale = []
+    watcher = MailWatcher(OneShotSource(service, ["a", "b", "c"]), announce, on_new_mail=stale.extend)
+    watcher.start()
+    watcher.set_idle(True)
+
+    assert done.wait(5)
+    assert spoken == ["New email from Bob about Hello.", "New email from Alice about Lunch."]
+    assert stale == ["a", "b", "c"]
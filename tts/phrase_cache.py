@@ -0,0 +1,129 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import scipy.io.wavfile as wav
+import sounddevice as sd
+
+# Constant assistant prompts worth rendering once
+CACHED_PHRASES = [
+    "Yes, I am listening",
+    "Anything else?",
+    "Okay. Going back to sleep.",
+    "I am going back to sleep.",
+    "Sorry, I did not understand",
+    "Invalid choice",
+    "Cancelled",
+    "Do you want me to read the email body?",
+    "Do you want to move this email to trash?",
+    "Do you want to reply or forward this email?",
+    "Do you want me to send this email?",
+    "Do you want me to send this reply?",
+    "Are you sure you want to delete this email?",
+    "Email moved to trash",
+    "Deletion cancelled",
+    "Which email should I read? Say a number between one and ten.",
+    "Which email should I read? Say one, two, or three.",
+    "Which email should I delete? Say one, two, or three.",
+    "Whom should I send the email to?",
+    "What is the subject?",
+    "Please tell the email body. I am listening.",
+    "Please tell your reply. I am listening.",
+    "Here is your reply",
+    "Here is the email content",
+    "Sending your email",
+    "Sending your reply",
+    "Forwarding the email",
+    "Email sent successfully",
+    "Reply sent successfully",
+    "Email cancelled",
+    "Reply cancelled",
+    "You have no unread emails",
+    "Your inbox is empty",
+]
+
+
+class PhraseCache:
+    """
+    Pre-rendered PCM for fixed prompts, stored on disk as WAV files
+    keyed by a hash of voice + text and kept in memory once loaded.
+
+    One-off text that is about to be spoken (e.g. the first sentence of
+    a prefetched email) can be rendered with ``prepare``; those entries
+    live in a small in-memory LRU only.
+    """
+
+    def __init__(self, engine, directory, phrases=CACHED_PHRASES, max_transient=16):
+        self.engine = engine
+        self.directory = directory
+        self.phrases = set(phrases)
+        self.max_transient = max_transient
+        self._audio = {}
+        self._transient = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def __contains__(self, text):
+        return text in self.phrases or text in self._transient
+
+    def prepare(self, text):
+        """
+        Render one-off text ahead of time (memory only).
+        """
+        if text in self:
+            return
+        entry = self.engine.synthesize(text)
+        with self._lock:
+            self._transient[text] = entry
+            while len(self._transient) > self.max_transient:
+                self._transient.popitem(last=False)
+
+    def _path(self, text):
+        key = hashlib.sha1(f"{self.engine.voice_id}\0{text}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{key}.wav")
+
+    def get(self, text):
+        """
+        Return (samples, sample_rate) for a fixed phrase, rendering and
+        storing it on first use, or for prepared one-off text.
+        None if the text is not cacheable.
+        """
+        with self._lock:
+            if text in self._transient:
+                return self._transient[text]
+            if text in self._audio:
+                return self._audio[text]
+
+        if text not in self.phrases:
+            return None
+
+        path = self._path(text)
+        if os.path.exists(path):
+            sample_rate, audio = wav.read(path)
+        else:
+            audio, sample_rate = self.engine.synthesize(text)
+            tmp = path + ".tmp"
+            wav.write(tmp, sample_rate, audio)
+            os.replace(tmp, path)
+
+        with self._lock:
+            self._audio[text] = (audio, sample_rate)
+        return audio, sample_rate
+
+    def prerender(self):
+        for text in sorted(self.phrases):
+            self.get(text)
+
+    def play(self, text) -> bool:
+        """
+        Play a cached phrase; False if it is not cacheable.
+        """
+        entry = self.get(text)
+        if entry is None:
+            return False
+        audio, sample_rate = entry
+        sd.play(np.asarray(audio), sample_rate)
+        sd.wait()
+        return True
@@ -1,9 +1,395 @@
+import itertools
+import os
+import pty
+import queue
+import select
 import subprocess
+import tempfile
+import threading
+import time
 
-def speak(text: str):
-    subprocess.run(
-        ["festival", "--tts"],
-        input=text.encode("utf-8"),
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL
-    )
+from config.settings import (
+    TTS_ENGINE,
+    PIPER_VOICE_PATH,
+    TTS_BATCH_MAX_CHARS,
+    TTS_CACHE_DIR,
+    TTS_TIMEOUT_SECONDS,
+    TTS_TIMEOUT_SECONDS_PER_CHAR,
+)
+
+_DONE_MARKER = "zara-tts-done"
+
+
+class FestivalEngine:
+    """
+    One long-lived ``festival --pipe`` process. The voice is loaded
+    once; every utterance is a (SayText ...) command on its stdin.
+
+    Festival's stdout is a pty, not a pipe, so its stdio is line
+    buffered and the done marker printed after each command arrives at
+    once. Every command also has a deadline scaled to the text length;
+    a process that misses it is killed and restarted on the next call.
+    """
+
+    name = "festival"
+    voice_id = "festival-default"
+
+    def __init__(self):
+        self._proc = None
+        self._out = None
+        self._pending = b""
+
+    def _ensure_process(self):
+        if self._proc is None or self._proc.poll() is not None:
+            self.close()
+            master, slave = pty.openpty()
+            try:
+                self._proc = subprocess.Popen(
+                    ["festival", "--pipe"],
+                    stdin=subprocess.PIPE,
+                    stdout=slave,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    bufsize=1,
+                )
+            except BaseException:
+                os.close(master)
+                raise
+            finally:
+                os.close(slave)
+            self._out = master
+            self._pending = b""
+        return self._proc
+
+    def _run(self, command: str, text: str = ""):
+        proc = self._ensure_process()
+        proc.stdin.write(f'{command}\n(print "{_DONE_MARKER}")\n')
+        proc.stdin.flush()
+
+        # commands run synchronously, the marker follows once it is done
+        deadline = time.monotonic() + TTS_TIMEOUT_SECONDS + len(text) * TTS_TIMEOUT_SECONDS_PER_CHAR
+        while _DONE_MARKER.encode() not in self._pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.close()
+                raise RuntimeError("festival did not finish in time, restarting it")
+            ready, _, _ = select.select([self._out], [], [], remaining)
+            if not ready:
+                continue
+            try:
+                chunk = os.read(self._out, 4096)
+            except OSError:
+                chunk = b""  # EIO once festival has exited
+            if not chunk:
+                self.close()
+                raise RuntimeError("festival exited while speaking")
+            self._pending += chunk
+        self._pending = b""
+
+    def say(self, text: str):
+        self._run(f'(SayText "{_escape(text)}")', text)
+
+    def synthesize(self, text: str):
+        import scipy.io.wavfile as wav
+
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            self._run(f'(utt.save.wave (SynthText "{_escape(text)}") "{_escape(path)}" \'riff)', text)
+            sample_rate, audio = wav.read(path)
+        finally:
+            os.remove(path)
+        return audio, sample_rate
+
+    def interrupt(self):
+        # killing festival is the only way to cut SayText short; the
+        # speaking thread sees it exit and the next utterance starts a
+        # fresh process
+        proc = self._proc
+        if proc and proc.poll() is None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=1.0)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    def close(self):
+        proc, out = self._proc, self._out
+        self._proc = self._out = None
+        if proc and proc.poll() is None:
+            proc.kill()
+        if proc:
+            proc.wait()
+            proc.stdin.close()
+        if out is not None:
+            os.close(out)
+
+
+class PiperEngine:
+    """
+    In-process piper voice, loaded once and played through sounddevice.
+    """
+
+    name = "piper"
+
+    def __init__(self, model_path: str):
+        from piper import PiperVoice
+        self.voice = PiperVoice.load(model_path)
+        self.voice_id = os.path.basename(model_path)
+
+    def synthesize(self, text: str):
+        import numpy as np
+
+        chunks = list(self.voice.synthesize(text))
+        if not chunks:
+            return np.zeros(0, dtype=np.int16), self.voice.config.sample_rate
+        audio = np.concatenate([c.audio_int16_array for c in chunks])
+        return audio, chunks[0].sample_rate
+
+    def say(self, text: str):
+        import sounddevice as sd
+
+        audio, sample_rate = self.synthesize(text)
+        if audio.size:
+            sd.play(audio, sample_rate)
+            sd.wait()
+
+    def interrupt(self):
+        import sounddevice as sd
+        sd.stop()
+
+    def close(self):
+        pass
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def create_engine():
+    if TTS_ENGINE == "piper":
+        try:
+            return PiperEngine(PIPER_VOICE_PATH)
+        except Exception as e:
+            print(f"Piper voice unavailable ({e}), falling back to festival")
+    return FestivalEngine()
+
+
+# Lower value = spoken first. Conversation uses PRIORITY_NORMAL;
+# background notices use PRIORITY_LOW so they never jump the queue.
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+_engine = None
+_engine_lock = threading.RLock()  # engines are not thread-safe
+_phrase_cache = None
+_queue = queue.PriorityQueue()
+_sequence = itertools.count()  # FIFO order within one priority
+_interrupted = threading.Event()
+_state_lock = threading.Lock()
+_in_flight = 0   # items queued or being spoken
+_generation = 0  # bumped by stop_speaking; older items are dropped
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = create_engine()
+    return _engine
+
+
+def get_phrase_cache():
+    global _phrase_cache
+    with _engine_lock:
+        if _phrase_cache is None:
+            from tts.phrase_cache import PhraseCache
+            _phrase_cache = PhraseCache(get_engine(), TTS_CACHE_DIR)
+    return _phrase_cache
+
+
+def prerender_phrases():
+    """
+    Render every fixed prompt to the phrase cache (run at startup).
+    """
+    with _engine_lock:
+        get_phrase_cache().prerender()
+
+
+_prepare_pool = None
+
+
+def prepare_async(text: str):
+    """
+    Synthesize text in the background so a later speak(text) plays
+    from memory. Rendering waits for the engine to be free.
+    """
+    global _prepare_pool
+    from concurrent.futures import ThreadPoolExecutor
+
+    with _engine_lock:
+        if _prepare_pool is None:
+            _prepare_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-prepare")
+
+    def render():
+        try:
+            with _engine_lock:
+                get_phrase_cache().prepare(text.strip())
+        except Exception as e:
+            print("TTS prepare ERROR:", e)
+
+    return _prepare_pool.submit(render)
+
+
+def _say(texts):
+    """
+    Speak a batch: fixed prompts play from the phrase cache, runs of
+    other text are merged and synthesized live.
+    """
+    engine = get_engine()
+    cache = get_phrase_cache()
+    pending = []
+
+    for text in texts:
+        if _interrupted.is_set():
+            return
+        if text.strip() in cache:
+            if pending:
+                engine.say(_join_sentences(pending))
+                pending = []
+            try:
+                cache.play(text.strip())
+                continue
+            except Exception as e:
+                print("TTS cache ERROR:", e)
+        pending.append(text)
+
+    if pending and not _interrupted.is_set():
+        engine.say(_join_sentences(pending))
+
+
+def _join_sentences(texts):
+    parts = []
+    for text in texts:
+        text = text.strip()
+        if text and text[-1] not in ".!?,;:":
+            text += "."
+        parts.append(text)
+    return " ".join(parts)
+
+
+def _finish(items):
+    global _in_flight
+    with _state_lock:
+        _in_flight -= len(items)
+    for item in items:
+        item[3].set()
+        _queue.task_done()
+
+
+def _run_worker():
+    while True:
+        batch = [_queue.get()]
+
+        # 📦 Merge whatever is already queued into one utterance
+        size = len(batch[0][2])
+        while size < TTS_BATCH_MAX_CHARS:
+            try:
+                item = _queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[2])
+
+        # items from before a stop that raced with the dequeue are
+        # dropped; a new utterance clears any earlier interrupt
+        with _state_lock:
+            stale = [item for item in batch if item[4] != _generation]
+            batch = [item for item in batch if item[4] == _generation]
+            if batch:
+                _interrupted.clear()
+        _finish(stale)
+        if not batch:
+            continue
+
+        try:
+            with _engine_lock:
+                _say([item[2] for item in batch])
+        except Exception as e:
+            if not _interrupted.is_set():
+                print("TTS ERROR:", e)
+        finally:
+            _finish(batch)
+
+
+def _ensure_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run_worker, name="tts", daemon=True)
+            _worker.start()
+
+
+def speak_async(text: str, priority=PRIORITY_NORMAL) -> threading.Event:
+    """
+    Queue text for speaking and return immediately.
+    The returned event is set once it has been spoken.
+    """
+    done = threading.Event()
+    if not text or not text.strip():
+        done.set()
+        return done
+
+    global _in_flight
+    _ensure_worker()
+    with _state_lock:
+        _in_flight += 1
+        _queue.put((priority, next(_sequence), text, done, _generation))
+    return done
+
+
+def speak(text: str, priority=PRIORITY_NORMAL):
+    """
+    Speak text and block until it (and everything queued before it)
+    has been spoken.
+    """
+    speak_async(text, priority).wait()
+
+
+def is_speaking() -> bool:
+    with _state_lock:
+        return _in_flight > 0
+
+
+def stop_speaking():
+    """
+    Cut off the current utterance and drop everything still queued.
+    Events of dropped items are set as if they had been spoken.
+    """
+    global _generation
+    dropped = []
+    with _state_lock:
+        _generation += 1
+        while True:
+            try:
+                dropped.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        speaking = _in_flight > len(dropped)
+        if speaking:
+            _interrupted.set()
+    _finish(dropped)
+
+    if not speaking:
+        return
+
+    import sounddevice as sd
+    sd.stop()  # cached prompts
+    if _engine is not None:
+        _engine.interrupt()
+
+
+def wait_until_idle():
+    _queue.join()
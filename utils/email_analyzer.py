@@ -1,49 +1,157 @@
-import re
-from html import unescape
+from html.parser import HTMLParser
+
+# Elements whose boundaries become sentence breaks when read aloud
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "caption", "dd", "div",
+    "dl", "dt", "figcaption", "footer", "form", "h1", "h2", "h3", "h4", "h5",
+    "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section",
+    "table", "td", "th", "tr", "ul",
+}
+
+# Elements whose content is never spoken
+SKIP_TAGS = {"head", "script", "style", "template", "svg"}
+
+_SENTENCE_END = ".!?,;:"
+
+# HTML is fed to the parser in slices of this many characters
+FEED_CHUNK_CHARS = 64 * 1024
+
+
+class HtmlTextExtractor(HTMLParser):
+    """
+    Single streaming pass over an HTML body: collects speakable text
+    (script/style dropped, block elements turned into sentence breaks,
+    entities decoded) and counts images, links and tables on the way.
+
+    Work is linear in the input. With ``max_chars`` the collected text
+    stops growing at that size while the counters keep going.
+    """
+
+    def __init__(self, max_chars=None):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.images = 0
+        self.links = 0
+        self.tables = 0
+        self._parts = []
+        self._size = 0
+        self._skip = 0
+        self._space = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip += 1
+            return
+        if tag == "img":
+            if not _is_tracking_pixel(attrs):
+                self.images += 1
+        elif tag == "a":
+            if any(name == "href" and value for name, value in attrs):
+                self.links += 1
+        elif tag == "table":
+            self.tables += 1
+
+        if tag in BLOCK_TAGS:
+            self._break()
+
+    def handle_startendtag(self, tag, attrs):
+        # <br/>, <img/>: never opens a skip region
+        if tag not in SKIP_TAGS:
+            self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag in BLOCK_TAGS:
+            self._break()
+
+    def handle_data(self, data):
+        if self._skip or self._full():
+            return
+        words = data.split()
+        if not words:
+            self._space = self._space or bool(data)
+            return
+        if self._parts and (self._space or data[0].isspace()):
+            self._append(" ")
+        self._append(" ".join(words))
+        self._space = data[-1].isspace()
+
+    def _append(self, text):
+        self._parts.append(text)
+        self._size += len(text)
+
+    def _full(self):
+        return self.max_chars is not None and self._size >= self.max_chars
+
+    def _break(self):
+        if self._full():
+            return
+        if self._parts and self._parts[-1][-1] not in _SENTENCE_END:
+            self._append(".")
+        self._space = True
+
+    @property
+    def text(self) -> str:
+        text = "".join(self._parts)
+        if self.max_chars is not None:
+            text = text[:self.max_chars]
+        return text.strip()
+
+
+def _is_tracking_pixel(attrs) -> bool:
+    attrs = dict(attrs)
+    return attrs.get("width") in ("0", "1") and attrs.get("height") in ("0", "1")
+
+
+def extract_html(html: str, max_chars=None) -> HtmlTextExtractor:
+    """
+    Run the extractor over ``html`` and return it (``.text`` plus the
+    image/link/table counts).
+    """
+    extractor = HtmlTextExtractor(max_chars)
+    for start in range(0, len(html), FEED_CHUNK_CHARS):
+        extractor.feed(html[start:start + FEED_CHUNK_CHARS])
+    extractor.close()
+    return extractor
 
 
 def analyze_email(email: dict) -> dict:
     """
     Analyze email content to detect:
     - html
-    - images
+    - images, links and tables
     - attachments
+    and the speakable text of the HTML part, all in one pass.
     """
-
-    has_html = False
-    has_images = False
-    attachments = []
+    attachments = email.get("attachments") or []
 
     html = email.get("html")
-    if html:
-        has_html = True
-        if re.search(r"<img\s", html, re.IGNORECASE):
-            has_images = True
-
-    attachments = email.get("attachments") or []
+    if not html:
+        return {
+            "has_html": False,
+            "has_images": False,
+            "images": 0,
+            "links": 0,
+            "tables": 0,
+            "attachments": attachments,
+            "text": "",
+        }
 
+    extracted = extract_html(html)
     return {
-        "has_html": has_html,
-        "has_images": has_images,
+        "has_html": True,
+        "has_images": extracted.images > 0,
+        "images": extracted.images,
+        "links": extracted.links,
+        "tables": extracted.tables,
         "attachments": attachments,
+        "text": extracted.text,
     }
 
 
-def html_to_text(html: str) -> str:
+def html_to_text(html: str, max_chars=None) -> str:
     """
-    Very lightweight HTML → text conversion
-    (safe for speech, no heavy libs)
+    HTML → text for speech: one streaming pass, no heavy libs.
     """
-    # Remove scripts/styles
-    html = re.sub(r"<(script|style).*?>.*?</\1>", "", html, flags=re.DOTALL)
-
-    # Remove all tags
-    text = re.sub(r"<[^>]+>", "", html)
-
-    # Decode HTML entities
-    text = unescape(text)
-
-    # Clean spacing
-    text = re.sub(r"\s+", " ", text).strip()
-
-    return text
+    return extract_html(html, max_chars).text